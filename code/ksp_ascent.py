@@ -0,0 +1,399 @@
+"""
+Подъём по программе разворота - общий код для ручного запуска и кампаний.
+
+AscentProgram - параметры одного полёта: программа тангажа, целевая
+высота, лимит времени. AscentGuidance - логика управления на один шаг:
+по телеметрии решает, какие команды отдать (через CommandOutput или любой
+объект с теми же методами). fly_ascent - цикл живого полёта через
+FlightLink: собирает телеметрию и возвращает её словарём массивов.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from ksp_mass import MassEstimator, MassStreams
+from ksp_pitch import (
+    FINAL_ALTITUDE,
+    FINAL_H_SPEED,
+    FINAL_PITCH,
+    TURN_ANGLE,
+    TURN_END,
+    TURN_START,
+    PitchProgram,
+)
+from ksp_spans import NO_SPANS
+
+# Причины окончания полёта
+ASCENT_STOPS = {
+    "time": "достигнуто максимальное время",
+    "altitude": "достигнута целевая высота",
+    "error": "ошибка",
+}
+
+# События отделения ступеней, о которых сообщает цикл полёта
+STAGING_MESSAGES = {
+    "stage": "Отделение ступени",
+    "retry": "Повтор команды отделения",
+    "ignition": "Зажигание следующей ступени",
+}
+
+# Массивы телеметрии, которые возвращает fly_ascent (и пишутся в архив)
+FLIGHT_ARRAYS = (
+    "times",
+    "speeds",
+    "altitudes",
+    "h_speeds",
+    "thrusts",
+    "stages",
+    "rates",
+    "masses",
+    "twrs",
+    "delta_vs",
+)
+
+
+class AscentProgram:
+    """Параметры полёта: программа тангажа, цель и лимит времени"""
+
+    def __init__(
+        self,
+        name="default",
+        # Программа разворота; по умолчанию - DEFAULT_PITCH, как в модели
+        turn_start=TURN_START,
+        turn_end=TURN_END,
+        turn_angle=TURN_ANGLE,
+        final_altitude=FINAL_ALTITUDE,
+        final_h_speed=FINAL_H_SPEED,
+        final_pitch=FINAL_PITCH,
+        heading=90,  # градусы, курс (90 - на восток)
+        target_altitude=450000,  # м
+        max_time=150,  # с
+        pitch_program=None,  # словарь PitchProgram; вместо turn_*/final_*
+    ):
+        self.name = name
+        self.turn_start = turn_start
+        self.turn_end = turn_end
+        self.turn_angle = turn_angle
+        self.final_altitude = final_altitude
+        self.final_h_speed = final_h_speed
+        self.final_pitch = final_pitch
+        self.heading = heading
+        self.target_altitude = target_altitude
+        self.max_time = max_time
+        self.pitch_program = pitch_program
+
+        # Та же программа тангажа, что и в модели (ksp_pitch)
+        if pitch_program is not None:
+            self._pitch = PitchProgram.from_dict(pitch_program)
+        else:
+            self._pitch = PitchProgram.turn(
+                turn_start,
+                turn_end,
+                turn_angle,
+                final_altitude=final_altitude,
+                final_h_speed=final_h_speed,
+                final_pitch=final_pitch,
+            )
+
+    def pitch(self, altitude, h_speed):
+        """Тангаж по программе, градусы"""
+        return self._pitch.scalar(altitude, h_speed)
+
+    def to_dict(self):
+        return {key: value for key, value in vars(self).items() if key[0] != "_"}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def load_programs(filename):
+    """Список программ полёта из JSON-файла (список словарей)"""
+    with open(filename, encoding="utf-8") as f:
+        return [AscentProgram.from_dict(item) for item in json.load(f)]
+
+
+class StagingSequencer:
+    """
+    Отделение ступеней без остановки цикла полёта.
+
+    Раньше после команды отделения цикл засыпал на секунду - без
+    управления и записи телеметрии в самый динамичный момент. Теперь
+    отделение - конечный автомат, который продвигается на каждой итерации:
+
+    - "idle": тяги нет и ступень не последняя - команда отделения;
+    - "staged": ждём, пока номер ступени уменьшится и появится тяга. Если
+      за timeout номер не изменился - команда повторяется; если ступень
+      сменилась, а тяги нет (ступень без двигателей, например только
+      разделитель) - отделяется следующая;
+    - "settling": двигатель зажёгся, settle секунд кратковременный провал
+      тяги не считается выгоранием.
+    """
+
+    def __init__(self, commands, timeout=1.0, settle=0.5):
+        self.commands = commands
+        self.timeout = timeout  # с, ожидание подтверждения отделения
+        self.settle = settle  # с, выдержка после зажигания
+        self.state = "idle"
+        self.stage = None  # ступень, с которой отдана команда
+        self.since = 0.0  # время входа в текущее состояние
+        self.retries = 0
+
+    def _command(self, t, stage, force=False):
+        self.commands.activate_next_stage(stage, force=force)
+        self.state = "staged"
+        self.stage = stage
+        self.since = t
+
+    def update(self, t, thrust, stage):
+        """
+        Шаг автомата. Возвращает событие ("stage", "retry", "ignition",
+        "settled") или None.
+        """
+        if self.state == "idle":
+            if thrust == 0 and stage > 1:
+                self._command(t, stage)
+                return "stage"
+            return None
+
+        if self.state == "staged":
+            if stage < self.stage:
+                if thrust > 0:
+                    self.state = "settling"
+                    self.since = t
+                    return "ignition"
+                if t - self.since > self.timeout and stage > 1:
+                    self._command(t, stage)
+                    return "stage"
+            elif t - self.since > self.timeout:
+                self.retries += 1
+                self._command(t, stage, force=True)
+                return "retry"
+            return None
+
+        if t - self.since > self.settle:
+            self.state = "idle"
+            return "settled"
+        return None
+
+
+class AscentGuidance:
+    """Решения автопилота на одну итерацию цикла полёта"""
+
+    def __init__(self, program, commands, spans=NO_SPANS):
+        self.program = program
+        self.commands = commands
+        self.staging = StagingSequencer(commands)
+        self.spans = spans
+
+    def launch(self, stage):
+        """Команды на старте: вертикально, полная тяга, первая ступень"""
+        self.commands.target_pitch_and_heading(90, self.program.heading)
+        self.commands.set_throttle(1.0)
+        self.commands.activate_next_stage(stage)
+
+    def finished(self, t, altitude):
+        """Причина окончания полёта или None"""
+        if t >= self.program.max_time:
+            return "time"
+        if altitude >= self.program.target_altitude:
+            return "altitude"
+        return None
+
+    def update(self, t, altitude, h_speed, thrust, stage):
+        """
+        Тангаж по программе и шаг автомата отделения ступеней.
+
+        Возвращает событие отделения (см. StagingSequencer) или None.
+        """
+        pitch = self.program.pitch(altitude, h_speed)
+        self.spans.mark("guidance")
+        # Неизменный тангаж не уходит в kRPC - его подавляет CommandOutput
+        self.commands.target_pitch_and_heading(pitch, self.program.heading)
+        event = self.staging.update(t, thrust, stage)
+        self.spans.mark("commands")
+        return event
+
+
+def detect_separation(thrusts):
+    """
+    Индекс отделения ускорителей по падению тяги или None.
+
+    Для старых записей без массы; в живом полёте отделение замечает
+    MassEstimator (поле "separations" у fly_ascent). Тяга падает больше
+    чем в 2.5 раза и через 10 отсчётов снова растёт (включился основной
+    двигатель). Отсчёты - на равномерной сетке.
+    """
+    if len(thrusts) <= 50:
+        return None
+    for i in range(20, len(thrusts) - 10):
+        if thrusts[i] < thrusts[i - 1] * 0.4 and thrusts[i] > 0:
+            # Проверяем, что после падения тяга снова растет (включение основного двигателя)
+            if i + 10 < len(thrusts) and thrusts[i + 10] > thrusts[i] * 1.5:
+                return i
+    return None
+
+
+def fly_ascent(
+    link,
+    program,
+    commands,
+    sampler,
+    bus=None,
+    profiler=None,
+    spans=NO_SPANS,
+    verbose=True,
+    mass=True,
+):
+    """
+    Живой полёт по программе; возвращает телеметрию словарём массивов.
+
+    Ключи: FLIGHT_ARRAYS, "separations" (время и сброшенная масса каждого
+    отделения по MassEstimator) и "stop" (см. ASCENT_STOPS). Ошибка kRPC
+    не прерывает вызывающий код: полёт заканчивается с stop = "error",
+    текст ошибки - в поле "error". spans - разметка итерации по фазам
+    FLIGHT_PHASES. mass=False - без потоков массы (masses, twrs, delta_vs
+    заполняются nan).
+    """
+    telemetry = link.telemetry
+    guidance = AscentGuidance(program, commands, spans)
+    mass_streams = None
+    estimator = None
+
+    times = []
+    speeds = []  # Глобальная скорость
+    altitudes = []  # Высота
+    h_speeds = []  # Горизонтальная скорость
+    thrusts = []  # Тяга
+    stages = []  # Текущая ступень
+    rates = []  # Частота каждого отсчёта, Гц
+    masses = []  # Масса корабля, кг
+    twrs = []  # Тяговооружённость
+    delta_vs = []  # Запас Δv всех ступеней, м/с
+
+    stop = None
+    error = ""
+
+    try:
+        # Подготовка к старту - тоже вызовы kRPC, ошибка в них - stop="error"
+        if mass:
+            # Сухая масса и двигатели ступеней запрашиваются здесь, до старта
+            mass_streams = MassStreams(link.telemetry_conn)
+            estimator = MassEstimator(mass_streams.stages)
+        link.vessel.control.gear = False
+        link.vessel.auto_pilot.engage()
+        guidance.launch(telemetry.stage())
+
+        start_time = time.time()
+        if verbose:
+            print("Время(с)  Высота(м)  Скорость(м/с)  Тяга(кН)")
+            print("-" * 60)
+
+        while True:
+            current_time = time.time() - start_time
+            altitude = telemetry.altitude()
+            stop = guidance.finished(current_time, altitude)
+            if stop:
+                break
+
+            current_speed = telemetry.speed()
+            h_speed = telemetry.h_speed()
+            thrust = telemetry.thrust()
+            stage = telemetry.stage()
+            surface_altitude = telemetry.surface_altitude()
+            separated = None
+            if estimator is not None:
+                separated = estimator.update(
+                    current_time, altitude, thrust, stage, *mass_streams.read()
+                )
+            spans.mark("telemetry")
+
+            times.append(current_time)
+            speeds.append(current_speed)
+            altitudes.append(altitude)
+            h_speeds.append(h_speed)
+            thrusts.append(thrust)
+            stages.append(stage)
+            if estimator is not None:
+                masses.append(estimator.mass)
+                twrs.append(estimator.twr)
+                delta_vs.append(estimator.delta_v_total)
+            else:
+                masses.append(np.nan)
+                twrs.append(np.nan)
+                delta_vs.append(np.nan)
+
+            # Частота отсчётов по фазе полёта
+            sampler.update(current_time, thrust, stage, surface_altitude)
+            rates.append(sampler.rate)
+            if bus is not None:
+                bus.publish(
+                    current_time,
+                    altitude,
+                    current_speed,
+                    h_speed,
+                    thrust,
+                    stage,
+                    sampler.rate,
+                )
+            spans.mark("record")
+
+            # Разметка "guidance"/"commands" - внутри guidance.update
+            event = guidance.update(current_time, altitude, h_speed, thrust, stage)
+
+            # Логирование каждые 10 секунд
+            if (
+                verbose
+                and int(current_time) % 10 == 0
+                and current_time - int(current_time) < sampler.period
+            ):
+                thrust_kn = thrust / 1000
+                print(
+                    f"{current_time:6.1f}с  {altitude:8.0f}м  {current_speed:10.1f}м/с  {thrust_kn:8.1f}кН"
+                )
+            if verbose and separated:
+                dropped = estimator.separations[-1][1] / 1000
+                print(f"\nОтделение на {current_time:.1f}с: сброшено {dropped:.1f} т")
+            if verbose and event in STAGING_MESSAGES:
+                print(f"\n{STAGING_MESSAGES[event]} на {current_time:.1f}с")
+            if profiler is not None:
+                profiler.tick()
+            spans.mark("print")
+            time.sleep(sampler.period)
+            spans.mark("sleep")
+            spans.tick(sampler.period)
+
+    except Exception as e:
+        stop = "error"
+        error = str(e)
+        if verbose:
+            print(f"\nОшибка: {e}")
+    finally:
+        if mass_streams is not None:
+            try:
+                mass_streams.remove()
+            except Exception:
+                pass  # подключение уже разорвано
+
+    if verbose and stop == "time":
+        print(f"\nДостигнуто максимальное время ({program.max_time} секунд)")
+
+    return dict(
+        times=np.array(times),
+        speeds=np.array(speeds),
+        altitudes=np.array(altitudes),
+        h_speeds=np.array(h_speeds),
+        thrusts=np.array(thrusts),
+        stages=np.array(stages),
+        rates=np.array(rates),
+        masses=np.array(masses),
+        twrs=np.array(twrs),
+        delta_vs=np.array(delta_vs),
+        separations=np.array(
+            estimator.separations if estimator is not None else []
+        ).reshape(-1, 2),
+        stop=stop,
+        error=error,
+    )
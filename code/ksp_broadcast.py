@@ -0,0 +1,391 @@
+"""
+Трансляция телеметрии по локальной сети.
+
+Сервер читает шину телеметрии (ksp_bus) как обычный читатель и рассылает
+кадры всем подключённым зрителям по TCP. К kRPC и циклу полёта он не
+обращается: скрипт полёта только пишет в разделяемую память, поэтому
+число зрителей на полёт не влияет. Сервер запускается на всю сессию: когда
+полёт закрывает шину, он ждёт шину следующего полёта.
+
+Кодирование кадра: поля квантуются до целых (время - мс, высота - дм,
+скорости - см/с, тяга - Н), от каждого берётся разность с предыдущим
+кадром, разность кодируется zigzag + varint. Медленно меняющиеся поля
+занимают по 1-2 байта. Каждый KEYFRAME_INTERVAL-й кадр - опорный
+(значения целиком), с него может начать новый или отставший зритель.
+
+Кадр на проводе: varint длины, байт флагов (1 - опорный), поля.
+Кадр кодируется один раз для всех зрителей. У каждого зрителя своя
+очередь на QUEUE_FRAMES кадров: если он не успевает читать, новые кадры
+для него отбрасываются и он ждёт следующего опорного - остальные
+зрители и сервер не тормозят.
+
+    python ksp_broadcast.py                    # сервер на порту 8765
+    python ksp_broadcast.py --watch HOST       # зритель
+    python ksp_broadcast.py --bench [полёт.npz]  # размер кадра
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import socket
+import time
+
+import numpy as np
+
+from ksp_bus import BUS_NAME, TELEMETRY_DTYPE, TelemetryReader
+
+PORT = 8765
+KEYFRAME_INTERVAL = 50  # кадров между опорными
+QUEUE_FRAMES = 64  # очередь одного зрителя, кадров
+POLL_INTERVAL = 0.02  # опрос шины, с
+BUS_TIMEOUT = 3.0  # без записей дольше - полёт закончен, шина переподключается
+
+# Поля кадра и множители квантования
+FIELDS = (
+    ("t", 1000),  # мс
+    ("altitude", 10),  # дм
+    ("speed", 100),  # см/с
+    ("h_speed", 100),  # см/с
+    ("thrust", 1),  # Н
+    ("stage", 1),
+    ("rate", 100),  # 0.01 Гц
+)
+
+_KEYFRAME = 1
+
+
+# ============================================================================
+# КОДИРОВАНИЕ
+# ============================================================================
+
+
+def _put_varint(out, value):
+    """zigzag + varint (7 бит на байт) для целого со знаком"""
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data, pos):
+    """Читает zigzag varint; возвращает (значение, новая позиция)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (result >> 1) ^ -(result & 1), pos
+
+
+class FrameEncoder:
+    """Кадры с разностным кодированием относительно предыдущего"""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self._previous = None
+        self._since_key = 0
+
+    def force_keyframe(self):
+        self._previous = None
+
+    def encode(self, values):
+        """Кадр (с префиксом длины) для значений в порядке FIELDS"""
+        current = [int(round(v * scale)) for v, (_, scale) in zip(values, FIELDS)]
+        key = self._previous is None or self._since_key >= self.keyframe_interval
+        payload = bytearray([_KEYFRAME if key else 0])
+        if key:
+            for q in current:
+                _put_varint(payload, q)
+            self._since_key = 1
+        else:
+            for q, p in zip(current, self._previous):
+                _put_varint(payload, q - p)
+            self._since_key += 1
+        self._previous = current
+
+        frame = bytearray()
+        _put_varint(frame, len(payload))
+        return bytes(frame + payload), key
+
+
+class FrameDecoder:
+    """Восстановление значений; до первого опорного кадра - None"""
+
+    def __init__(self):
+        self._previous = None
+
+    def decode(self, payload):
+        key = payload[0] & _KEYFRAME
+        if not key and self._previous is None:
+            return None
+        pos = 1
+        current = []
+        for i in range(len(FIELDS)):
+            q, pos = _get_varint(payload, pos)
+            current.append(q if key else q + self._previous[i])
+        self._previous = current
+        return {name: q / scale for q, (name, scale) in zip(current, FIELDS)}
+
+
+def read_frame(stream):
+    """Payload следующего кадра из файлового объекта сокета; None - конец"""
+    length = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            return None
+        length |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            break
+        shift += 7
+    length = (length >> 1) ^ -(length & 1)
+    payload = stream.read(length)
+    return payload if len(payload) == length else None
+
+
+# ============================================================================
+# СЕРВЕР
+# ============================================================================
+
+
+class _Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(QUEUE_FRAMES)
+        self.need_key = True
+        self.dropped = 0
+
+    async def send_loop(self):
+        while True:
+            frame = await self.queue.get()
+            self.writer.write(frame)
+            await self.writer.drain()
+
+
+class BroadcastServer:
+    """Рассылка кадров с шины телеметрии всем зрителям"""
+
+    def __init__(self, host="0.0.0.0", port=PORT, bus_name=BUS_NAME):
+        self.host = host
+        self.port = port
+        self.bus_name = bus_name
+        self.encoder = FrameEncoder()
+        self.subscribers = set()
+        self.frames = 0
+        self.bytes = 0
+
+    async def _serve_client(self, reader, writer):
+        subscriber = _Subscriber(writer)
+        self.subscribers.add(subscriber)
+        # Новому зрителю нужен опорный кадр - не ждём очередного
+        self.encoder.force_keyframe()
+        peer = writer.get_extra_info("peername")
+        print(f"+ зритель {peer}, всего {len(self.subscribers)}")
+        try:
+            await subscriber.send_loop()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            writer.close()
+            print(f"- зритель {peer}, пропущено кадров {subscriber.dropped}")
+
+    def _broadcast(self, record):
+        frame, key = self.encoder.encode([record[name] for name, _ in FIELDS])
+        self.frames += 1
+        self.bytes += len(frame)
+        for subscriber in self.subscribers:
+            if subscriber.need_key and not key:
+                subscriber.dropped += 1
+                continue
+            try:
+                subscriber.queue.put_nowait(frame)
+                subscriber.need_key = False
+            except asyncio.QueueFull:
+                # Зритель отстал: цепочка разностей прервана до опорного кадра
+                subscriber.dropped += 1
+                subscriber.need_key = True
+
+    async def _attach(self):
+        """Ждёт появления шины и подключается к ней"""
+        while True:
+            try:
+                return TelemetryReader(self.bus_name)
+            except FileNotFoundError:
+                await asyncio.sleep(1.0)  # полёт ещё не начался
+
+    async def _relay(self, reader):
+        """Рассылает записи шины; выход, если их нет дольше BUS_TIMEOUT"""
+        last = time.monotonic()
+        while True:
+            records = reader.read()
+            if len(records):
+                last = time.monotonic()
+                for record in records:
+                    self._broadcast(record)
+            elif time.monotonic() - last > BUS_TIMEOUT:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _pump(self):
+        """
+        Сервер работает всю сессию: когда полёт закрывает шину (сегмент
+        удалён, записи перестали поступать), читатель закрывается и сервер
+        ждёт шину следующего полёта
+        """
+        cursor = 0
+        try:
+            while True:
+                reader = await self._attach()
+                if reader.cursor < cursor:
+                    # Счётчик меньше прежнего - шина нового полёта, читаем
+                    # её с первой записи
+                    reader.cursor = 0
+                print(f"Шина {self.bus_name} подключена")
+                self.encoder.force_keyframe()
+                try:
+                    await self._relay(reader)
+                finally:
+                    cursor = reader.cursor
+                    reader.close()
+                print(f"Шина {self.bus_name}: нет записей {BUS_TIMEOUT:.0f} с")
+        finally:
+            if self.frames:
+                print(
+                    f"Кадров: {self.frames}, "
+                    f"в среднем {self.bytes / self.frames:.1f} байт/кадр"
+                )
+
+    async def run(self):
+        server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        print(f"Трансляция на {self.host}:{self.port}")
+        async with server:
+            await self._pump()
+
+
+# ============================================================================
+# ЗРИТЕЛЬ И ЗАМЕР
+# ============================================================================
+
+
+def watch(host, port=PORT):
+    """Печатает телеметрию с сервера трансляции"""
+    decoder = FrameDecoder()
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile("rb")
+        print("Время(с)  Высота(м)  Скорость(м/с)  Тяга(кН)")
+        while True:
+            payload = read_frame(stream)
+            if payload is None:
+                break
+            rec = decoder.decode(payload)
+            if rec is not None:
+                print(
+                    f"{rec['t']:6.1f}с  {rec['altitude']:8.0f}м  "
+                    f"{rec['speed']:10.1f}м/с  {rec['thrust'] / 1000:8.1f}кН"
+                )
+
+
+def _bench_records(filename):
+    """Записи для замера: из архива полёта или из модели подъёма"""
+    if filename:
+        from ksp_plot import load_flight
+
+        flight = load_flight(filename)
+        columns = [
+            flight["times"],
+            flight["altitudes"],
+            flight["speeds"],
+            flight.get("h_speeds", np.zeros(len(flight["times"]))),
+            flight["thrusts"],
+            flight.get("stages", np.zeros(len(flight["times"]))),
+            flight.get("rates", np.full(len(flight["times"]), 10.0)),
+        ]
+        return np.column_stack(columns).tolist()
+
+    from ksp_sim import Stage, simulate
+
+    sim = simulate(
+        [Stage(6.06e6, 3000, 79.5), Stage(1.44e6, 535, 70, start_mass=199000)],
+        439000,
+        t_max=150,
+    )
+    boosters = sim["t"] < 79.5
+    thrust = np.where(boosters, 6.06e6, 1.44e6)
+    stage = np.where(boosters, 3, 2)
+    rate = np.full(len(stage), 10.0)
+    return np.column_stack(
+        [sim["t"], sim["h"], sim["v"], sim["vx"], thrust, stage, rate]
+    ).tolist()
+
+
+def bench(filename=None):
+    """Размер кадра в разных кодировках и стоимость кодирования"""
+    records = _bench_records(filename)
+    n = len(records)
+    names = [name for name, _ in FIELDS]
+
+    raw = TELEMETRY_DTYPE.itemsize - 8  # запись шины без seq
+    as_json = sum(len(json.dumps(dict(zip(names, r)))) for r in records)
+
+    key_only = FrameEncoder(keyframe_interval=1)
+    keyframes = sum(len(key_only.encode(r)[0]) for r in records)
+
+    encoder = FrameEncoder()
+    decoder = FrameDecoder()
+    start = time.perf_counter()
+    frames = [encoder.encode(r)[0] for r in records]
+    encode_us = (time.perf_counter() - start) / n * 1e6
+    deltas = sum(len(f) for f in frames)
+
+    # Проверка: восстановление с точностью до кванта
+    error = 0.0
+    for frame, r in zip(frames, records):
+        decoded = decoder.decode(read_frame(io.BytesIO(frame)))
+        for (name, scale), value in zip(FIELDS, r):
+            error = max(error, abs(decoded[name] - value) * scale)
+
+    print(f"Кадров: {n}")
+    print(f"{'Кодировка':28} {'байт/кадр':>10}")
+    print(f"{'запись шины (7 полей)':28} {raw:10.1f}")
+    print(f"{'JSON':28} {as_json / n:10.1f}")
+    print(f"{'varint, только опорные':28} {keyframes / n:10.1f}")
+    print(f"{'varint, разности':28} {deltas / n:10.1f}")
+    print(f"Кодирование: {encode_us:.1f} мкс/кадр")
+    print(f"Ошибка восстановления: {error:.2f} кванта")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Трансляция телеметрии по сети")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--bus", default=BUS_NAME)
+    parser.add_argument("--watch", metavar="HOST", help="подключиться зрителем")
+    parser.add_argument(
+        "--bench", nargs="?", const="", metavar="FLIGHT", help="замер размера кадра"
+    )
+    args = parser.parse_args()
+
+    if args.bench is not None:
+        bench(args.bench or None)
+    elif args.watch:
+        try:
+            watch(args.watch, args.port)
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            asyncio.run(BroadcastServer(args.host, args.port, args.bus).run())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
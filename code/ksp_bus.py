@@ -0,0 +1,237 @@
+"""
+Шина телеметрии в разделяемой памяти (один писатель, много читателей).
+
+Процесс полёта пишет записи фиксированного формата в кольцевой буфер
+multiprocessing.shared_memory. Любое число локальных процессов-читателей
+(логирование, обнаружение событий, графики, экспорт) читает их без
+копирования, каждый в своём темпе. Писатель не знает о читателях, поэтому
+стоимость публикации в цикле управления от их числа не зависит.
+
+Каждая запись снабжена счётчиком seq (последнее поле): нечётное значение -
+запись в процессе, 2n+2 - запись n готова. Писатель перезаписывает слоты
+строго по порядку, поэтому целостность блока определяется по seq его
+первой записи. Если писатель обогнал читателя больше чем на ёмкость
+буфера, читатель фиксирует переполнение и перескакивает на самые старые
+доступные данные.
+
+Просмотр шины из другого процесса:
+    python ksp_bus.py
+"""
+
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+BUS_NAME = "ksp_telemetry"
+
+# Формат записи; seq обязательно последним полем
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("t", "<f8"),  # время полёта, с
+        ("altitude", "<f8"),  # высота над уровнем моря, м
+        ("speed", "<f8"),  # орбитальная скорость, м/с
+        ("h_speed", "<f8"),  # горизонтальная скорость, м/с
+        ("thrust", "<f8"),  # тяга, Н
+        ("stage", "<i8"),  # текущая ступень
+        ("rate", "<f8"),  # частота отсчётов, Гц
+        ("seq", "<u8"),
+    ]
+)
+
+_MAGIC = 0x4B535042  # "KSPB"
+_HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "<u4"),
+        ("itemsize", "<u4"),
+        ("capacity", "<u8"),
+        ("write_count", "<u8"),
+    ]
+)
+_HEADER_SIZE = 64
+
+
+class BusOverrun(Exception):
+    """Писатель перезаписал данные, которые читатель ещё обрабатывал"""
+
+
+def _attach(name):
+    """Подключение к существующему сегменту без передачи его resource_tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # До Python 3.13 трекер удалил бы сегмент при выходе читателя
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _views(shm, capacity):
+    header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shm.buf)
+    records = np.ndarray(
+        (capacity,), dtype=TELEMETRY_DTYPE, buffer=shm.buf, offset=_HEADER_SIZE
+    )
+    return header, records
+
+
+class TelemetryBus:
+    """Писатель: создаёт сегмент и публикует записи"""
+
+    def __init__(self, name=BUS_NAME, capacity=4096):
+        size = _HEADER_SIZE + capacity * TELEMETRY_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Сегмент остался от упавшего запуска
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.name = name
+        self.capacity = capacity
+        self._header, self._records = _views(self.shm, capacity)
+        self._header["magic"] = _MAGIC
+        self._header["itemsize"] = TELEMETRY_DTYPE.itemsize
+        self._header["capacity"] = capacity
+        self._header["write_count"] = 0
+        self._count = 0
+
+    def publish(self, t, altitude, speed, h_speed, thrust, stage, rate):
+        """Записывает одну запись; O(1) независимо от числа читателей"""
+        n = self._count
+        slot = n % self.capacity
+        # Сначала помечаем слот как занятый, затем пишем запись целиком
+        self._records["seq"][slot] = 2 * n + 1
+        self._records[slot] = (
+            t,
+            altitude,
+            speed,
+            h_speed,
+            thrust,
+            stage,
+            rate,
+            2 * n + 2,
+        )
+        self._count = n + 1
+        self._header["write_count"] = self._count
+
+    def close(self):
+        """Освобождает сегмент (читатели сохраняют свои отображения)"""
+        self._header = self._records = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class TelemetryReader:
+    """Читатель: подключается к шине и читает записи без копирования"""
+
+    def __init__(self, name=BUS_NAME, from_start=False):
+        self.shm = _attach(name)
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=self.shm.buf)
+        if header["magic"] != _MAGIC or header["itemsize"] != TELEMETRY_DTYPE.itemsize:
+            self.shm.close()
+            raise ValueError(f"Сегмент {name} не является шиной телеметрии")
+
+        self.capacity = int(header["capacity"])
+        self._header, self._records = _views(self.shm, self.capacity)
+        self.cursor = 0 if from_start else int(self._header["write_count"])
+        self.lost = 0  # записей пропущено из-за переполнения
+        self._pending = None
+
+    def _skip_overrun(self, written):
+        oldest = written - self.capacity
+        if self.cursor < oldest:
+            self.lost += oldest - self.cursor
+            self.cursor = oldest
+
+    def poll(self, max_records=None):
+        """
+        Возвращает представление (view) новых записей без копирования.
+
+        Блок не переходит через конец буфера, поэтому за один вызов может
+        вернуться меньше записей, чем доступно. После обработки блока
+        нужно вызвать release(), который проверит, не перезаписал ли его
+        писатель за это время.
+        """
+        written = int(self._header["write_count"])
+        self._skip_overrun(written)
+
+        start = self.cursor
+        end = written
+        if max_records is not None:
+            end = min(end, start + max_records)
+        slot = start % self.capacity
+        end = min(end, start + (self.capacity - slot))
+
+        self._pending = (start, end, slot)
+        return self._records[slot : slot + (end - start)]
+
+    def release(self):
+        """Подтверждает обработку последнего блока; BusOverrun при потере"""
+        start, end, slot = self._pending
+        self._pending = None
+        self.cursor = end
+        if end == start:
+            return
+        # Слоты перезаписываются по порядку: если первая запись блока цела,
+        # цел и весь блок
+        if self._records["seq"][slot] != 2 * start + 2:
+            raise BusOverrun(f"Записи {start}..{end} перезаписаны во время чтения")
+
+    def read(self, max_records=None):
+        """Копия новых записей: безопасно хранить после возврата"""
+        block = self.poll(max_records)
+        copy = block.copy()
+        try:
+            self.release()
+        except BusOverrun:
+            self.lost += len(copy)
+            return copy[:0]
+        return copy
+
+    def wait(self, timeout=None, interval=0.01):
+        """Ждёт появления новых записей; False по таймауту"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while int(self._header["write_count"]) <= self.cursor:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(interval)
+        return True
+
+    def close(self):
+        self._header = self._records = None
+        self.shm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Просмотр шины телеметрии")
+    parser.add_argument("--name", default=BUS_NAME)
+    args = parser.parse_args()
+
+    reader = TelemetryReader(args.name)
+    print(f"Подключено к {args.name} (ёмкость {reader.capacity} записей)")
+    print("Время(с)  Высота(м)  Скорость(м/с)  Тяга(кН)")
+    try:
+        while True:
+            if not reader.wait(timeout=1.0):
+                continue
+            for rec in reader.read():
+                print(
+                    f"{rec['t']:6.1f}с  {rec['altitude']:8.0f}м  "
+                    f"{rec['speed']:10.1f}м/с  {rec['thrust'] / 1000:8.1f}кН"
+                )
+            if reader.lost:
+                print(f"Пропущено записей: {reader.lost}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
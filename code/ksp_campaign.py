@@ -0,0 +1,279 @@
+"""
+Кампания запусков без оператора.
+
+Для каждой программы полёта из списка (JSON-файл со списком параметров
+AscentProgram):
+
+1. откат к старту (revert_to_launch) или загрузка сохранения на стартовом
+   столе через kRPC, ожидание загрузки сцены;
+2. полёт по программе (fly_ascent из ksp_ascent);
+3. телеметрия и параметры программы - в архив ksp_flights/.
+
+Падение ракеты, ошибка kRPC или зависание не останавливают кампанию:
+полёт записывается с результатом, при потере связи подключение
+открывается заново, неудачный полёт повторяется до --retries раз.
+Сторожевой таймер закрывает подключения, если полёт идёт дольше
+max_time + TIMEOUT_MARGIN - тогда зависший вызов kRPC завершается ошибкой.
+
+    python ksp_campaign.py programs.json --repeat 3
+    python ksp_campaign.py programs.json --save campaign_pad
+
+Пример programs.json:
+
+    [{"name": "turn_20km", "turn_end": 20000},
+     {"name": "turn_30km", "turn_end": 30000, "max_time": 180}]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from ksp_ascent import FLIGHT_ARRAYS, AscentProgram, fly_ascent, load_programs
+from ksp_control import CommandOutput
+from ksp_link import FlightLink
+from ksp_plot import FLIGHTS_DIR, save_flight
+from ksp_sampling import AdaptiveSampler
+
+SCENE_TIMEOUT = 60  # с, ожидание корабля на стартовом столе после отката
+TIMEOUT_MARGIN = 30  # с сверх max_time до срабатывания сторожевого таймера
+RECONNECT_ATTEMPTS = 10
+RECONNECT_DELAY = 10  # с
+
+# Результаты полёта
+RESULTS = {
+    "ok": "выполнен",
+    "crash": "корабль потерян",
+    "error": "ошибка kRPC",
+    "timeout": "зависание",
+}
+
+
+def connect(name):
+    """Подключение с повторными попытками (KSP мог перезапускаться)"""
+    for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+        try:
+            return FlightLink(name=name)
+        except Exception as e:
+            print(f"Нет связи с KSP ({e}), попытка {attempt}/{RECONNECT_ATTEMPTS}")
+            time.sleep(RECONNECT_DELAY)
+    raise ConnectionError("не удалось подключиться к KSP")
+
+
+class Campaign:
+    """Серия полётов с восстановлением стартового положения перед каждым"""
+
+    def __init__(self, name=None, save=None, create_save=False, retries=1):
+        self.name = name or "campaign_" + datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.save = save  # имя сохранения; None - откат к старту
+        self.retries = retries
+        self.results = []
+        self.link = connect(self.name)
+        if create_save:
+            self.link.control_conn.space_center.save(save)
+            print(f"Стартовое положение сохранено: {save}")
+
+    def restore(self):
+        """Откат к старту или загрузка сохранения; ждёт корабль на столе"""
+        space_center = self.link.control_conn.space_center
+        if self.save:
+            space_center.load(self.save)
+        else:
+            space_center.revert_to_launch()
+
+        deadline = time.monotonic() + SCENE_TIMEOUT
+        while True:
+            try:
+                vessel = space_center.active_vessel
+                if vessel.situation == space_center.VesselSituation.pre_launch:
+                    break
+            except Exception:
+                pass  # сцена ещё загружается
+            if time.monotonic() > deadline:
+                raise TimeoutError("корабль не появился на стартовом столе")
+            time.sleep(1)
+        self.link.reattach()
+
+    def reconnect(self):
+        try:
+            self.link.close()
+        except Exception:
+            pass  # подключение уже разорвано
+        self.link = connect(self.name)
+
+    def _fly(self, program):
+        """
+        Один полёт под сторожевым таймером; возвращает (flight, result,
+        error). flight - None, если ошибка случилась до начала записи.
+        """
+        timed_out = threading.Event()
+
+        def watchdog():
+            timed_out.set()
+            # Закрытие подключений прерывает зависший вызов kRPC
+            self.link.control_conn.close()
+            self.link.telemetry_conn.close()
+
+        timer = threading.Timer(program.max_time + TIMEOUT_MARGIN, watchdog)
+        timer.start()
+        try:
+            flight = fly_ascent(
+                self.link,
+                program,
+                CommandOutput(self.link.vessel),
+                AdaptiveSampler(base_period=0.1),
+                verbose=False,
+            )
+        except Exception as e:
+            # Сторож закрыл подключения до цикла полёта или оно оборвалось
+            # ещё при подготовке - телеметрии нет, полёт повторяется
+            print(f"  полёт не начался ({e})")
+            return None, "timeout" if timed_out.is_set() else "error", str(e)
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            return flight, "timeout", flight["error"]
+        if flight["stop"] != "error":
+            try:
+                self.link.vessel.auto_pilot.disengage()
+            except Exception:
+                pass
+            return flight, "ok", ""
+        # Ошибка: пропала связь или корабль разрушен
+        try:
+            self.link.control_conn.krpc.get_status()
+        except Exception:
+            return flight, "error"
+        try:
+            self.link.vessel.situation
+        except Exception:
+            return flight, "crash", flight["error"]
+        return flight, "error", flight["error"]
+
+    def _attempt(self, name, program, flight, result, error, wall):
+        """Запись одной попытки; телеметрия, даже неполная, - в архив"""
+        record = dict(result=result, wall_time=wall)
+        if error:
+            record["error"] = error
+        if flight is not None and len(flight["times"]):
+            arrays = {key: flight[key] for key in FLIGHT_ARRAYS}
+            record["file"] = save_flight(
+                name=name,
+                stop=flight["stop"] or "",
+                error=flight["error"],
+                result=result,
+                program=json.dumps(program.to_dict()),
+                separations=flight["separations"],
+                **arrays,
+            )
+            record["max_altitude"] = float(flight["altitudes"].max())
+            record["final_speed"] = float(flight["speeds"][-1])
+        return record
+
+    def run_one(self, index, program):
+        """
+        Полёт с повторами. Каждая попытка - в списке attempts сводки (файл
+        повтора - с суффиксом _tryN), итог полёта - по последней попытке.
+        """
+        name = f"{self.name}_{index:03d}_{program.name}"
+        attempts = []
+        for attempt in range(1, self.retries + 2):
+            started = time.time()
+            try:
+                self.restore()
+            except Exception as e:
+                print(f"  подготовка не удалась ({e}), переподключение")
+                wall = time.time() - started
+                attempts.append(
+                    dict(result="error", wall_time=wall, error=f"подготовка: {e}")
+                )
+                self.reconnect()
+                continue
+
+            started = time.time()
+            flight, result, error = self._fly(program)
+            wall = time.time() - started
+            if result in ("timeout", "error"):
+                self.reconnect()
+            suffix = f"_try{attempt}" if attempt > 1 else ""
+            attempts.append(
+                self._attempt(name + suffix, program, flight, result, error, wall)
+            )
+            if result == "ok":
+                break
+            if attempt <= self.retries:
+                print(f"  {RESULTS[result]}, повтор")
+
+        record = dict(index=index, program=program.name, **attempts[-1])
+        record["attempts"] = attempts
+        self.results.append(record)
+        return record
+
+    def run(self, programs):
+        started = time.time()
+        for index, program in enumerate(programs, 1):
+            print(f"[{index}/{len(programs)}] {program.name}...")
+            record = self.run_one(index, program)
+            line = f"  {RESULTS[record['result']]}, {record['wall_time']:.0f} с"
+            if "max_altitude" in record:
+                line += (
+                    f", высота {record['max_altitude']/1000:.1f} км, "
+                    f"скорость {record['final_speed']:.0f} м/с"
+                )
+            print(line)
+        self.summary(time.time() - started)
+        self.link.close()
+
+    def summary(self, elapsed):
+        """Сводка кампании на экран и в ksp_flights/<кампания>.json"""
+        ok = sum(r["result"] == "ok" for r in self.results)
+        print("\n" + "=" * 60)
+        print(f"КАМПАНИЯ {self.name}: полётов {len(self.results)}, успешных {ok}")
+        if elapsed > 0:
+            print(
+                f"- Время: {elapsed/60:.1f} мин, "
+                f"{len(self.results) / elapsed * 3600:.1f} полётов в час"
+            )
+        for key, text in RESULTS.items():
+            count = sum(r["result"] == key for r in self.results)
+            if count and key != "ok":
+                print(f"- {text}: {count}")
+
+        os.makedirs(FLIGHTS_DIR, exist_ok=True)
+        filename = os.path.join(FLIGHTS_DIR, f"{self.name}.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        print(f"✓ Сводка: {filename}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Серия полётов без оператора")
+    parser.add_argument("programs", nargs="?", help="JSON со списком программ полёта")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="повторов каждой программы"
+    )
+    parser.add_argument("--name", default=None, help="имя кампании")
+    parser.add_argument("--load", default=None, help="загружать это сохранение")
+    parser.add_argument(
+        "--save", default=None, help="сохранить стартовое положение под этим именем"
+    )
+    parser.add_argument("--retries", type=int, default=1)
+    args = parser.parse_args()
+
+    programs = load_programs(args.programs) if args.programs else [AscentProgram()]
+    programs = [p for p in programs for _ in range(args.repeat)]
+
+    campaign = Campaign(
+        name=args.name,
+        save=args.save or args.load,
+        create_save=args.save is not None,
+        retries=args.retries,
+    )
+    campaign.run(programs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Слой управляющих команд с объединением и подавлением повторов.
+
+Цикл подъёма отправляет target_pitch_and_heading каждую итерацию, даже
+когда угол не изменился (выше 30 км - одно и то же (5, 90)). CommandOutput
+запоминает последние отправленные тангаж, курс, тягу и ступень и делает
+RPC только если значение ушло дальше зоны нечувствительности или прошёл
+интервал обновления. Подавленные команды считаются.
+"""
+
+import time
+
+
+class CommandOutput:
+    """Отправка команд кораблю без повторов"""
+
+    def __init__(
+        self,
+        vessel,
+        pitch_deadband=0.25,  # градусы
+        heading_deadband=0.25,  # градусы
+        throttle_deadband=0.01,
+        refresh=2.0,  # повтор неизменной команды не чаще, с
+        clock=time.monotonic,
+    ):
+        # Объекты автопилота и управления получаем один раз - это тоже RPC
+        self.auto_pilot = vessel.auto_pilot
+        self.control = vessel.control
+        self.pitch_deadband = pitch_deadband
+        self.heading_deadband = heading_deadband
+        self.throttle_deadband = throttle_deadband
+        self.refresh = refresh
+        self.clock = clock
+
+        self.pitch = None
+        self.heading = None
+        self.throttle = None
+        self.staged_from = None  # ступень, с которой уже отдана команда отделения
+        self._attitude_time = -float("inf")
+        self._throttle_time = -float("inf")
+
+        self.sent = {"attitude": 0, "throttle": 0, "stage": 0}
+        self.suppressed = {"attitude": 0, "throttle": 0, "stage": 0}
+
+    def target_pitch_and_heading(self, pitch, heading):
+        """Команда автопилоту; True, если RPC был отправлен"""
+        now = self.clock()
+        if (
+            self.pitch is not None
+            and abs(pitch - self.pitch) <= self.pitch_deadband
+            and abs(heading - self.heading) <= self.heading_deadband
+            and now - self._attitude_time < self.refresh
+        ):
+            self.suppressed["attitude"] += 1
+            return False
+        self.auto_pilot.target_pitch_and_heading(pitch, heading)
+        self.pitch = pitch
+        self.heading = heading
+        self._attitude_time = now
+        self.sent["attitude"] += 1
+        return True
+
+    def set_throttle(self, throttle):
+        """Установка тяги; True, если RPC был отправлен"""
+        now = self.clock()
+        if (
+            self.throttle is not None
+            and abs(throttle - self.throttle) <= self.throttle_deadband
+            and now - self._throttle_time < self.refresh
+            # Полное выключение и полная тяга всегда доходят точно
+            and (throttle not in (0.0, 1.0) or throttle == self.throttle)
+        ):
+            self.suppressed["throttle"] += 1
+            return False
+        self.control.throttle = throttle
+        self.throttle = throttle
+        self._throttle_time = now
+        self.sent["throttle"] += 1
+        return True
+
+    def activate_next_stage(self, current_stage, force=False):
+        """
+        Отделение ступени один раз для каждой текущей ступени.
+
+        force=True - повтор команды, которую корабль не выполнил.
+        """
+        if self.staged_from == current_stage and not force:
+            self.suppressed["stage"] += 1
+            return False
+        self.control.activate_next_stage()
+        self.staged_from = current_stage
+        self.sent["stage"] += 1
+        return True
+
+    def summary(self):
+        """Печатает число отправленных и подавленных команд"""
+        print("\nКОМАНДЫ УПРАВЛЕНИЯ:")
+        names = {"attitude": "Ориентация", "throttle": "Тяга", "stage": "Ступени"}
+        for key, name in names.items():
+            sent = self.sent[key]
+            suppressed = self.suppressed[key]
+            total = sent + suppressed
+            if total:
+                print(
+                    f"- {name}: отправлено {sent}, подавлено {suppressed} "
+                    f"({suppressed / total * 100:.0f}%)"
+                )
@@ -0,0 +1,261 @@
+"""
+Замер задержки от команды до отклика корабля.
+
+Цикл подъёма и AutoShutdown отдают команды (target_pitch_and_heading,
+control.throttle) и считают, что корабль отзывается сразу. На деле между
+вызовом и изменением тангажа или тяги проходят кадры физики, а автопилот
+ещё и доворачивает с перерегулированием. Этот скрипт подаёт ступенчатые
+команды и по потокам телеметрии (каждый физический кадр) отмечает:
+
+- задержку - время от отправки команды до ухода величины на 10 % шага;
+- нарастание - от 10 % до 90 % шага;
+- установление - с какого момента величина остаётся в полосе около цели
+  (5 % шага, но не уже SETTLE_TOLERANCE).
+
+Время меряется по часам компьютера (perf_counter) и по игровому времени
+(ut): первое - то, что видит цикл полёта, второе не зависит от нагрузки на
+KSP. Отклик приходит через поток телеметрии, поэтому задержка включает и
+доставку потока - как и в настоящем цикле полёта.
+
+Корабль должен стоять устойчиво: для тяги - на стартовом столе с
+включёнными двигателями и держателями, для тангажа - на орбите.
+
+    python ksp_latency.py --mode throttle --steps 10
+    python ksp_latency.py --mode pitch --size 10 --out latency.npz
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ksp_link import FlightLink, StreamGroup
+
+# Допуск установления по величинам (в единицах величины)
+SETTLE_TOLERANCE = {"throttle": 1000.0, "pitch": 0.5}  # Н, градусы
+
+RESPONSE_NAMES = {"throttle": "Тяга", "pitch": "Тангаж"}
+
+
+def step_metrics(times, values, t_command, start, target, tolerance=0.0):
+    """
+    Задержка, нарастание и установление одного шага.
+
+    times, values - отсчёты отклика после команды, t_command - время
+    отправки, start/target - значение до шага и цель. Возвращает словарь
+    latency, rise, settling (с, от t_command; nan - не достигнуто).
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    step = target - start
+    if step == 0 or len(times) == 0:
+        return dict(latency=np.nan, rise=np.nan, settling=np.nan)
+    # Доля пройденного шага: 0 - исходное значение, 1 - цель
+    progress = (values - start) / step
+
+    def first(mask):
+        i = np.flatnonzero(mask)
+        return times[i[0]] - t_command if len(i) else np.nan
+
+    latency = first(progress >= 0.1)
+    rise = first(progress >= 0.9) - latency
+
+    band = max(0.05 * abs(step), tolerance)
+    outside = np.flatnonzero(np.abs(values - target) > band)
+    if len(outside) == 0:
+        settling = times[0] - t_command
+    elif outside[-1] + 1 < len(times):
+        settling = times[outside[-1] + 1] - t_command
+    else:
+        settling = np.nan  # к концу записи так и не установилось
+    return dict(latency=latency, rise=rise, settling=settling)
+
+
+class ResponseProbe(StreamGroup):
+    """Отсчёты игрового времени, тангажа и тяги на каждом физическом кадре"""
+
+    def __init__(self, link):
+        conn = link.telemetry_conn
+        super().__init__(conn)
+        vessel = conn.space_center.active_vessel
+        flight = vessel.flight(vessel.surface_reference_frame)
+        self.ut = self.add(getattr, conn.space_center, "ut")
+        self.pitch = self.add(getattr, flight, "pitch")
+        self.thrust = self.add(getattr, vessel, "thrust")
+
+    def record(self, duration):
+        """
+        Отсчёты за duration секунд: массив (perf_counter, ut, тангаж, тяга).
+
+        Ждёт обновления потока ut, поэтому строка - один кадр физики, а не
+        повторное чтение того же значения.
+        """
+        rows = []
+        deadline = time.perf_counter() + duration
+        with self.ut.condition:
+            while time.perf_counter() < deadline:
+                self.ut.wait(timeout=0.1)
+                now = time.perf_counter()
+                rows.append((now, self.ut(), self.pitch(), self.thrust()))
+        return np.array(rows).reshape(-1, 4)
+
+
+def _command(link, mode, value, heading):
+    """Отправка команды; возвращает (perf_counter до вызова, длительность RPC)"""
+    start = time.perf_counter()
+    if mode == "throttle":
+        link.vessel.control.throttle = value
+    else:
+        link.vessel.auto_pilot.target_pitch_and_heading(value, heading)
+    return start, time.perf_counter() - start
+
+
+def run_steps(link, probe, mode, levels, steps, hold):
+    """
+    Серия шагов между двумя уровнями levels (тяга 0..1 или тангаж, °).
+
+    Перед серией величина выводится на первый уровень и успевает
+    установиться. Возвращает список словарей по шагам.
+    """
+    column = 2 if mode == "pitch" else 3
+    heading = 90.0
+    tolerance = SETTLE_TOLERANCE[mode]
+    results = []
+    try:
+        if mode == "pitch":
+            link.vessel.auto_pilot.engage()
+        _command(link, mode, levels[0], heading)
+        settled = probe.record(hold)
+
+        for i in range(steps):
+            level = levels[(i + 1) % 2]
+            start = settled[-5:, column].mean() if len(settled) else np.nan
+            ut_before = probe.ut()
+            t_command, rpc = _command(link, mode, level, heading)
+            rows = probe.record(hold)
+            if len(rows) == 0:
+                continue
+            # Цель по тяге - установившееся значение (полная тяга в Н заранее
+            # не известна), по тангажу - заданный угол
+            target = rows[-5:, column].mean() if mode == "throttle" else level
+            metrics = step_metrics(
+                rows[:, 0], rows[:, column], t_command, start, target, tolerance
+            )
+            # То же в игровом времени: первый кадр после команды - шаг ut
+            ut_metrics = step_metrics(
+                rows[:, 1], rows[:, column], ut_before, start, target, tolerance
+            )
+            frame = np.median(np.diff(rows[:, 1])) if len(rows) > 1 else np.nan
+            results.append(
+                dict(
+                    level=level,
+                    start=start,
+                    target=target,
+                    rpc=rpc,
+                    frame=frame,
+                    latency_ut=ut_metrics["latency"],
+                    **metrics,
+                )
+            )
+            settled = rows
+    finally:
+        # Корабль остаётся в безопасном состоянии и при прерывании замера
+        if mode == "pitch":
+            link.vessel.auto_pilot.disengage()
+        else:
+            link.vessel.control.throttle = 0.0
+    return results
+
+
+def _percentiles(values):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)] * 1000
+    if len(values) == 0:
+        return "    -        -        -"
+    p50, p90 = np.percentile(values, [50, 90])
+    return f"{p50:7.1f}  {p90:7.1f}  {values.max():7.1f}"
+
+
+def summary(mode, results):
+    """Распределение задержки и установления по шагам серии"""
+    print("\n" + "=" * 60)
+    print(f"ОТКЛИК НА КОМАНДЫ: {RESPONSE_NAMES[mode]}, шагов {len(results)}")
+    print("=" * 60)
+    print(
+        f"{'Шаг':>4} {'Цель':>9} {'RPC,мс':>7} {'Задержка':>9} "
+        f"{'Кадров':>7} {'Уст.,мс':>8}"
+    )
+    for i, r in enumerate(results, 1):
+        frames = r["latency_ut"] / r["frame"] if r["frame"] else np.nan
+        print(
+            f"{i:4d} {r['target']:9.1f} {r['rpc'] * 1000:7.1f} "
+            f"{r['latency'] * 1000:7.0f}мс {frames:7.1f} {r['settling'] * 1000:8.0f}"
+        )
+
+    print(f"\n{'мс':24} {'p50':>7}  {'p90':>7}  {'макс':>7}")
+    for key, name in (
+        ("rpc", "Вызов RPC"),
+        ("latency", "Задержка отклика"),
+        ("latency_ut", "Задержка (игр. время)"),
+        ("rise", "Нарастание 10-90 %"),
+        ("settling", "Установление"),
+    ):
+        print(f"{name:24} {_percentiles([r[key] for r in results])}")
+
+    latency = np.array([r["latency"] for r in results], dtype=float)
+    if np.any(~np.isnan(latency)):
+        p90 = np.nanpercentile(latency, 90)
+        print(
+            f"\nКоманды чаще чем раз в {p90 * 1000:.0f} мс (p90 задержки) "
+            f"корабль не успевает отработать"
+        )
+    unsettled = sum(np.isnan(r["settling"]) for r in results)
+    if unsettled:
+        print(f"Не установилось за время шага: {unsettled} (увеличьте --hold)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка отклика на команды")
+    parser.add_argument("--mode", choices=("throttle", "pitch"), default="throttle")
+    parser.add_argument("--steps", type=int, default=10, help="число шагов")
+    parser.add_argument(
+        "--hold", type=float, default=3.0, help="время на каждый шаг, с"
+    )
+    parser.add_argument(
+        "--low", type=float, default=0.5, help="нижний уровень тяги (0..1)"
+    )
+    parser.add_argument(
+        "--pitch", type=float, default=45.0, help="исходный тангаж, градусы"
+    )
+    parser.add_argument("--size", type=float, default=10.0, help="шаг тангажа, градусы")
+    parser.add_argument("--out", default=None, help="сохранить результаты в .npz")
+    args = parser.parse_args()
+
+    if args.mode == "throttle":
+        levels = (args.low, 1.0)
+    else:
+        levels = (args.pitch, args.pitch + args.size)
+
+    link = FlightLink(name="KSP_Latency")
+    probe = ResponseProbe(link)
+    try:
+        results = run_steps(link, probe, args.mode, levels, args.steps, args.hold)
+    except KeyboardInterrupt:
+        print("\nЗамер прерван")
+        return
+    finally:
+        probe.remove()
+        link.close()
+
+    summary(args.mode, results)
+    if args.out and results:
+        np.savez(
+            args.out,
+            mode=args.mode,
+            **{key: np.array([r[key] for r in results]) for key in results[0]},
+        )
+        print(f"✓ Результаты: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Раздельные подключения kRPC для управления и телеметрии.
+
+Раньше команды автопилоту и чтение телеметрии шли через одно подключение:
+пачка запросов на чтение задерживала команды (блокировка в начале очереди).
+FlightLink открывает два подключения:
+
+- управляющее (control_conn) - только команды: автопилот, тяга, ступени;
+- телеметрическое (telemetry_conn) - потоки (streams) kRPC, которые сервер
+  сам присылает каждый физический кадр. Их принимает фоновый поток клиента,
+  а чтение значения в цикле полёта - это локальное обращение без RPC.
+
+Поэтому задержка команд не зависит от объёма собираемой телеметрии.
+"""
+
+import krpc
+
+
+class StreamGroup:
+    """Потоки одного подключения, которые останавливаются вместе"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._streams = []
+
+    def add(self, func, *args):
+        """Новый поток conn.add_stream(func, *args) в составе группы"""
+        stream = self.conn.add_stream(func, *args)
+        self._streams.append(stream)
+        return stream
+
+    def __len__(self):
+        return len(self._streams)
+
+    def remove(self):
+        """Останавливает все потоки"""
+        for stream in self._streams:
+            stream.remove()
+        self._streams = []
+
+
+class TelemetryStreams(StreamGroup):
+    """Потоки телеметрии активного корабля на отдельном подключении"""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self.vessel = vessel = conn.space_center.active_vessel
+        flight = vessel.flight()
+
+        self.altitude = self.add(getattr, flight, "mean_altitude")
+        self.surface_altitude = self.add(getattr, flight, "surface_altitude")
+        self.h_speed = self.add(getattr, flight, "horizontal_speed")
+        self.speed = self.add(getattr, vessel.orbit, "speed")
+        self.thrust = self.add(getattr, vessel, "thrust")
+        self.stage = self.add(getattr, vessel.control, "current_stage")
+
+
+class FlightLink:
+    """Управляющее и телеметрическое подключения к одному кораблю"""
+
+    def __init__(self, name="KSP_Telemetry", **connect_args):
+        self.control_conn = krpc.connect(name=f"{name}_control", **connect_args)
+        self.telemetry_conn = krpc.connect(name=f"{name}_telemetry", **connect_args)
+
+        # Команды - только через управляющее подключение
+        self.vessel = self.control_conn.space_center.active_vessel
+        self.telemetry = TelemetryStreams(self.telemetry_conn)
+
+    def reattach(self):
+        """Заново получает активный корабль и потоки (после отката или загрузки)"""
+        self.telemetry.remove()
+        self.vessel = self.control_conn.space_center.active_vessel
+        self.telemetry = TelemetryStreams(self.telemetry_conn)
+
+    def close(self):
+        self.telemetry.remove()
+        self.telemetry_conn.close()
+        self.control_conn.close()
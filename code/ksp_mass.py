@@ -0,0 +1,287 @@
+"""
+Масса, тяговооружённость и запас характеристической скорости в полёте.
+
+Модель считает, что масса убывает с постоянным mdot, а ускорители весят
+ровно 240 т; скрипты полёта массу не измеряли вовсе, и отделение
+ускорителей искалось после полёта по провалу тяги. Здесь масса и топливо
+читаются потоками kRPC (на телеметрическом подключении):
+
+- vessel.mass, available_thrust, specific_impulse;
+- масса топлива каждой ступени отделения (resources_in_decouple_stage).
+
+Сухая масса и удельный импульс двигателей каждой ступени отделения
+запрашиваются один раз при создании потоков. MassEstimator на каждом
+отсчёте за O(число ступеней) считает массу, тяговооружённость и запас
+Δv по ступеням (формула Циолковского от текущей массы) и замечает
+отделение: масса упала сильнее, чем могло сгореть топлива при текущей
+тяге и удельном импульсе.
+
+    python ksp_mass.py           # оценка в реальном времени
+    python ksp_mass.py --bench   # стоимость дополнительных потоков
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from ksp_link import StreamGroup
+from ksp_sim import R, g0
+
+# Топливо, масса которого учитывается
+FUELS = ("LiquidFuel", "Oxidizer", "SolidFuel")
+
+# Отделение: скачок массы сверх сгоревшего топлива больше этой доли массы
+# и не меньше SEPARATION_MIN_MASS
+SEPARATION_DROP = 0.01
+SEPARATION_MIN_MASS = 50.0  # кг
+
+
+class StageInfo:
+    """Ступень отделения: что уходит вместе с ней"""
+
+    def __init__(self, decouple_stage, dry_mass, isp):
+        self.decouple_stage = decouple_stage  # номер ступени, при которой отделяется
+        self.dry_mass = dry_mass  # кг, сухая масса отделяемых деталей
+        self.isp = isp  # с, удельный импульс её двигателей (0 - двигателей нет)
+
+
+class MassEstimator:
+    """
+    Оценка массы и Δv по отсчётам телеметрии.
+
+    stages - StageInfo в порядке отделения (первой уходит ступень с
+    наибольшим номером). Ступень считается отделённой, когда номер
+    текущей ступени корабля не больше её decouple_stage.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.mass = math.nan
+        self.twr = math.nan
+        self.available_twr = math.nan
+        self.delta_v = [0.0] * len(self.stages)  # м/с по ступеням
+        self.delta_v_total = 0.0
+        self.separations = []  # (время, сброшенная масса, кг)
+        self._t = None
+        self._burn_rate = 0.0  # кг/с при тяге прошлого отсчёта
+
+    def update(self, t, altitude, thrust, stage, mass, available_thrust, isp, fuel):
+        """
+        Новый отсчёт; fuel - масса топлива по ступеням в порядке stages
+        (последние четыре аргумента - MassStreams.read()).
+
+        Возвращает "separation", если с прошлого отсчёта отделилась масса,
+        иначе None.
+        """
+        event = None
+        if self._t is not None:
+            burned = self._burn_rate * (t - self._t)
+            dropped = self.mass - mass - burned
+            if dropped > max(SEPARATION_MIN_MASS, SEPARATION_DROP * self.mass):
+                self.separations.append((t, dropped))
+                event = "separation"
+        self._t = t
+        self._burn_rate = thrust / (isp * g0) if isp > 0 else 0.0
+
+        self.mass = mass
+        weight = mass * g0 * (R / (R + altitude)) ** 2
+        self.twr = thrust / weight
+        self.available_twr = available_thrust / weight
+
+        # Циолковский по ступеням: текущая масса, затем сброс сухой массы
+        m = mass
+        total = 0.0
+        active = True  # первая неотделённая ступень - работающая
+        for i, info in enumerate(self.stages):
+            if stage <= info.decouple_stage:
+                self.delta_v[i] = 0.0
+                continue
+            stage_isp = isp if active and isp > 0 else info.isp
+            f = fuel[i]
+            if f > 0 and m > f and stage_isp > 0:
+                dv = stage_isp * g0 * math.log(m / (m - f))
+                active = False
+            else:
+                dv = 0.0
+            self.delta_v[i] = dv
+            total += dv
+            m -= f + info.dry_mass
+        self.delta_v_total = total
+        return event
+
+
+class MassStreams(StreamGroup):
+    """Потоки массы, тяги, удельного импульса и топлива ступеней"""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        space_center = conn.space_center
+        vessel = space_center.active_vessel
+
+        self.mass = self.add(getattr, vessel, "mass")
+        self.available_thrust = self.add(getattr, vessel, "available_thrust")
+        self.isp = self.add(getattr, vessel, "specific_impulse")
+
+        # Разовые запросы: детали по ступеням отделения (первой - наибольший
+        # номер; -1 - детали, которые не отделяются никогда)
+        parts = vessel.parts
+        decouple_stages = sorted({p.decouple_stage for p in parts.all}, reverse=True)
+        stages = []
+        self._fuel = []  # по ступеням: [(поток количества, плотность), ...]
+        for number in decouple_stages:
+            stage_parts = parts.in_decouple_stage(number)
+            dry_mass = sum(p.dry_mass for p in stage_parts)
+            engines = [p.engine for p in stage_parts if p.engine is not None]
+            stages.append(StageInfo(number, dry_mass, _combined_isp(engines)))
+
+            resources = vessel.resources_in_decouple_stage(number, cumulative=False)
+            names = set(resources.names)
+            density = space_center.Resources.density
+            self._fuel.append(
+                [
+                    (self.add(resources.amount, name), density(name))
+                    for name in FUELS
+                    if name in names
+                ]
+            )
+        self.stages = stages
+
+    def read(self):
+        """(масса, доступная тяга, удельный импульс, топливо по ступеням)"""
+        fuel = [
+            sum(amount() * density for amount, density in stage) for stage in self._fuel
+        ]
+        return self.mass(), self.available_thrust(), self.isp(), fuel
+
+
+def _combined_isp(engines):
+    """Удельный импульс группы двигателей, взвешенный по тяге (вакуум), с"""
+    thrust = 0.0
+    flow = 0.0
+    for engine in engines:
+        isp = engine.vacuum_specific_impulse
+        if isp > 0:
+            thrust += engine.max_vacuum_thrust
+            flow += engine.max_vacuum_thrust / isp
+    return thrust / flow if flow > 0 else 0.0
+
+
+# ============================================================================
+# ЗАМЕР И ОЦЕНКА В РЕАЛЬНОМ ВРЕМЕНИ
+# ============================================================================
+
+
+def _read_base(telemetry):
+    telemetry.altitude()
+    telemetry.speed()
+    telemetry.h_speed()
+    telemetry.thrust()
+    telemetry.stage()
+    telemetry.surface_altitude()
+
+
+def bench(link, ticks=2000, period=0.01):
+    """
+    Стоимость потоков массы для цикла полёта.
+
+    Меряет время чтения телеметрии за итерацию без потоков массы и с ними
+    (вместе с расчётом MassEstimator) и задержку управляющего вызова kRPC,
+    пока телеметрическое подключение принимает больше данных.
+    """
+    telemetry = link.telemetry
+    status = link.control_conn.krpc.get_status
+
+    def run(streams=None, estimator=None):
+        reads = np.zeros(ticks)
+        rpcs = np.zeros(ticks)
+        for i in range(ticks):
+            start = time.perf_counter()
+            _read_base(telemetry)
+            if streams is not None:
+                estimator.update(
+                    start,
+                    telemetry.altitude(),
+                    telemetry.thrust(),
+                    telemetry.stage(),
+                    *streams.read(),
+                )
+            middle = time.perf_counter()
+            status()
+            rpcs[i] = time.perf_counter() - middle
+            reads[i] = middle - start
+            time.sleep(period)
+        return reads * 1e6, rpcs * 1000
+
+    base_reads, base_rpcs = run()
+    streams = MassStreams(link.telemetry_conn)
+    count = len(streams)
+    try:
+        estimator = MassEstimator(streams.stages)
+        mass_reads, mass_rpcs = run(streams, estimator)
+    finally:
+        streams.remove()
+
+    print(f"Дополнительных потоков: {count}, ступеней отделения: {len(streams.stages)}")
+    print(f"{'':28} {'чтение p50':>11} {'p99':>8} {'RPC p50':>9} {'p99':>8}")
+    for name, reads, rpcs in (
+        ("без потоков массы", base_reads, base_rpcs),
+        ("с потоками и оценкой", mass_reads, mass_rpcs),
+    ):
+        r50, r99 = np.percentile(reads, [50, 99])
+        c50, c99 = np.percentile(rpcs, [50, 99])
+        print(f"{name:28} {r50:8.1f}мкс {r99:6.1f}мкс {c50:7.2f}мс {c99:6.2f}мс")
+
+
+def watch(link, period=0.5):
+    """Печатает массу, тяговооружённость и запас Δv"""
+    streams = MassStreams(link.telemetry_conn)
+    estimator = MassEstimator(streams.stages)
+    telemetry = link.telemetry
+    start = time.perf_counter()
+    print("Время(с)  Масса(т)   TWR   Δv(м/с)  по ступеням")
+    try:
+        while True:
+            t = time.perf_counter() - start
+            event = estimator.update(
+                t,
+                telemetry.altitude(),
+                telemetry.thrust(),
+                telemetry.stage(),
+                *streams.read(),
+            )
+            if event:
+                print(f"Отделение: {estimator.separations[-1][1] / 1000:.1f} т")
+            per_stage = " ".join(f"{dv:.0f}" for dv in estimator.delta_v)
+            print(
+                f"{t:7.1f}  {estimator.mass / 1000:8.1f}  {estimator.twr:5.2f}  "
+                f"{estimator.delta_v_total:7.0f}  {per_stage}"
+            )
+            time.sleep(period)
+    finally:
+        streams.remove()
+
+
+def main():
+    from ksp_link import FlightLink
+
+    parser = argparse.ArgumentParser(description="Масса и запас Δv в полёте")
+    parser.add_argument("--bench", action="store_true", help="стоимость потоков")
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    link = FlightLink(name="KSP_Mass")
+    try:
+        if args.bench:
+            bench(link, args.ticks)
+        else:
+            watch(link)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        link.close()
+
+
+if __name__ == "__main__":
+    main()
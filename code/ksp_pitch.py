@@ -0,0 +1,148 @@
+"""
+Программа тангажа - одна для модели и для полёта в KSP.
+
+Раньше программа была записана трижды: get_pitch в движке модели,
+AscentProgram.pitch в цикле подъёма и формула с TURN_START/TURN_END в
+скрипте ksp_v(h). PitchProgram задаётся узлами (высота, тангаж) с
+линейной интерполяцией между ними и правилом пологого участка: выше
+final_altitude при горизонтальной скорости больше final_h_speed -
+final_pitch. Ниже первого узла держится его тангаж, выше последнего -
+тангаж последнего.
+
+Узлы компилируются в таблицу с шагом step по высоте. Расчёт тангажа
+(program(h, vx), program.scalar) - индекс ячейки и одно умножение, без
+ветвления по участкам. Узлы, не попадающие на сетку таблицы, срезаются
+не больше чем на ячейку.
+
+DEFAULT_PITCH - программа по умолчанию и для модели (ksp_sim.get_pitch),
+и для полёта (AscentProgram без параметров): вертикально до 800 м,
+линейный разворот от 90° до 10° к 25 км, выше 30 км при vx > 800 м/с -
+5°.
+
+Программа сохраняется и читается из JSON:
+
+    {"knots": [[800, 90], [25000, 10]],
+     "final_altitude": 30000, "final_h_speed": 800, "final_pitch": 5}
+"""
+
+import json
+
+import numpy as np
+
+TABLE_STEP = 10.0  # м
+
+# Программа разворота по умолчанию
+TURN_START = 800.0  # м, начало разворота
+TURN_END = 25000.0  # м, конец разворота
+TURN_ANGLE = 80.0  # градусы, на сколько наклоняемся к концу разворота
+FINAL_ALTITUDE = 30000.0  # м, выше - пологий участок
+FINAL_H_SPEED = 800.0  # м/с, горизонтальная скорость для пологого участка
+FINAL_PITCH = 5.0  # градусы
+
+
+class PitchProgram:
+    """Тангаж по высоте и горизонтальной скорости из заранее рассчитанной таблицы"""
+
+    def __init__(
+        self,
+        knots,
+        final_altitude=None,  # м, None - пологого участка нет
+        final_h_speed=FINAL_H_SPEED,  # м/с
+        final_pitch=FINAL_PITCH,  # градусы
+        step=TABLE_STEP,
+    ):
+        knots = sorted((float(h), float(p)) for h, p in knots)
+        if not knots:
+            raise ValueError("программа тангажа без узлов")
+        self.knots = knots
+        self.final_altitude = final_altitude
+        self.final_h_speed = final_h_speed
+        self.final_pitch = final_pitch
+        self.step = step
+
+        heights = np.array([h for h, _ in knots])
+        pitches = np.array([p for _, p in knots])
+        n = max(1, int(np.ceil(heights[-1] / step)))
+        # Узлы таблицы 0, step, ..., n*step; наклон - до следующего узла
+        self.grid = np.arange(n + 1) * step
+        self.table = np.interp(self.grid, heights, pitches)
+        self.scalar = self._compile()
+
+    @classmethod
+    def turn(
+        cls,
+        turn_start=TURN_START,
+        turn_end=TURN_END,
+        turn_angle=TURN_ANGLE,
+        final_altitude=None,  # None - сразу после разворота
+        final_h_speed=FINAL_H_SPEED,
+        final_pitch=FINAL_PITCH,
+        step=TABLE_STEP,
+    ):
+        """Вертикальный подъём, линейный разворот на turn_angle, пологий участок"""
+        return cls(
+            [(turn_start, 90.0), (turn_end, 90.0 - turn_angle)],
+            final_altitude=turn_end if final_altitude is None else final_altitude,
+            final_h_speed=final_h_speed,
+            final_pitch=final_pitch,
+            step=step,
+        )
+
+    def _compile(self):
+        """Скалярная функция (h, vx) -> тангаж на списках таблицы"""
+        table = self.table.tolist()
+        slopes = (np.diff(self.table) / self.step).tolist() + [0.0]
+        last = len(table) - 1
+        final_altitude = (
+            float("inf") if self.final_altitude is None else self.final_altitude
+        )
+
+        def pitch(
+            h,
+            vx,
+            _table=table,
+            _slopes=slopes,
+            _inv_step=1.0 / self.step,
+            _step=self.step,
+            _last=last,
+            _final=(final_altitude, self.final_h_speed, self.final_pitch),
+        ):
+            if h > _final[0] and vx > _final[1]:
+                return _final[2]
+            if h <= 0.0:
+                return _table[0]
+            i = int(h * _inv_step)
+            if i >= _last:
+                return _table[_last]
+            return _table[i] + (h - i * _step) * _slopes[i]
+
+        return pitch
+
+    def __call__(self, h, vx):
+        return self.scalar(h, vx)
+
+    def to_dict(self):
+        return dict(
+            knots=[list(knot) for knot in self.knots],
+            final_altitude=self.final_altitude,
+            final_h_speed=self.final_h_speed,
+            final_pitch=self.final_pitch,
+            step=self.step,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def save(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# Одна программа по умолчанию для модели и для полёта
+DEFAULT_PITCH = PitchProgram.turn(final_altitude=FINAL_ALTITUDE)
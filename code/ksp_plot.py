@@ -0,0 +1,432 @@
+"""
+Шаблоны графиков и пакетная отрисовка.
+
+Каждый тип графика (v(t), v(h)) строится один раз на процесс: оси, сетка,
+подписи и артисты ключевых точек создаются заранее, а при отрисовке нового
+полёта меняются только данные линий. Пакет заданий раскидывается по пулу
+процессов с неинтерактивным бэкендом Agg.
+
+Запуск из командной строки:
+    python ksp_plot.py ksp_flights/*.npz --format png svg --workers 4
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Версия оформления: увеличивать при любом изменении стиля графиков
+STYLE_VERSION = 1
+
+FLIGHTS_DIR = "ksp_flights"
+GRAPHS_DIR = "ksp_graphs"
+
+_BOX = dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.9)
+
+
+# ============================================================================
+# ОФОРМЛЕНИЕ ОСЕЙ (общее для скриптов и шаблонов)
+# ============================================================================
+
+
+def style_speed_time(ax, title, v_max=2000, v_minor=50, t_max=150):
+    """Оси, сетка и подписи графика скорости от времени"""
+    ax.set_xlabel("Время полета, с", fontsize=14, fontweight="bold", labelpad=10)
+    ax.set_ylabel("Скорость ракеты, м/с", fontsize=14, fontweight="bold", labelpad=10)
+    ax.set_title(title, fontsize=16, fontweight="bold", pad=20)
+
+    ax.set_xlim(0, t_max)
+    ax.set_ylim(0, v_max)
+
+    ax.set_xticks(np.arange(0, t_max + 1, 25))
+    ax.set_yticks(np.arange(0, v_max + 1, 250))
+    ax.set_xticks(np.arange(0, t_max + 1, 5), minor=True)
+    ax.set_yticks(np.arange(0, v_max + 1, v_minor), minor=True)
+    ax.grid(True, which="major", linestyle="-", alpha=0.3, linewidth=1.0)
+    ax.grid(True, which="minor", linestyle=":", alpha=0.15, linewidth=0.5)
+
+
+def style_speed_height(ax, title, v_max=1200, h_max=70):
+    """Оси, сетка и подписи графика скорости от высоты"""
+    ax.set_xlabel("Скорость, м/с", fontsize=14, fontweight="bold")
+    ax.set_ylabel("Высота, км", fontsize=14, fontweight="bold")
+    ax.set_title(title, fontsize=16, fontweight="bold")
+
+    ax.set_xlim(0, v_max)
+    ax.set_ylim(0, h_max)
+
+    ax.set_xticks(np.arange(0, v_max + 1, 200))
+    ax.set_yticks(np.arange(0, h_max + 1, 10))
+    ax.set_xticks(np.arange(0, v_max + 1, 100), minor=True)
+    ax.set_yticks(np.arange(0, h_max + 1, 5), minor=True)
+    ax.grid(True, which="major", linestyle="-", alpha=0.3, linewidth=1.0)
+    ax.grid(True, which="minor", linestyle=":", alpha=0.2, linewidth=0.5)
+
+    # Основные линии сетки
+    for y in range(10, h_max, 10):
+        ax.axhline(y=y, color="gray", linestyle=":", alpha=0.3, linewidth=0.8)
+    for x in range(200, v_max, 200):
+        ax.axvline(x=x, color="gray", linestyle=":", alpha=0.3, linewidth=0.8)
+
+
+def nearest_index(values, target):
+    """Индекс ближайшего к target элемента массива"""
+    return int(np.argmin(np.abs(np.asarray(values) - target)))
+
+
+# ============================================================================
+# ШАБЛОНЫ
+# ============================================================================
+
+
+class SpeedTimeTemplate:
+    """Шаблон графика v(t): линия KSP/модели, идеальная скорость, отделение"""
+
+    KEY_TIMES = [25, 50, 75, 100, 125]
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+        from matplotlib.patches import Rectangle
+
+        self.fig = Figure(figsize=(14, 8))
+        ax = self.ax = self.fig.add_subplot()
+        style_speed_time(ax, "")
+
+        (self.line,) = ax.plot([], [], "b-", linewidth=3.5, zorder=5, alpha=0.95)
+        (self.ideal,) = ax.plot(
+            [], [], "r--", linewidth=3.0, alpha=0.9, zorder=6, dashes=(6, 3)
+        )
+
+        # Зоны работы двигателей: прямоугольники на всю высоту осей
+        band = ax.get_xaxis_transform()
+        self.boost_zone = Rectangle(
+            (0, 0),
+            0,
+            1,
+            transform=band,
+            alpha=0.07,
+            color="blue",
+            zorder=1,
+        )
+        self.main_zone = Rectangle(
+            (0, 0),
+            0,
+            1,
+            transform=band,
+            alpha=0.07,
+            color="green",
+            zorder=1,
+        )
+        ax.add_patch(self.boost_zone)
+        ax.add_patch(self.main_zone)
+        self.sep_line = ax.axvline(
+            x=0, color="darkred", linestyle=":", linewidth=2.0, alpha=0.7, zorder=4
+        )
+
+        # Ключевые точки
+        (self.sep_point,) = ax.plot(
+            [],
+            [],
+            "o",
+            markersize=10,
+            markeredgecolor="darkred",
+            markerfacecolor="red",
+            markeredgewidth=2,
+            zorder=7,
+        )
+        self.sep_text = ax.text(
+            0,
+            0,
+            "",
+            fontsize=11,
+            color="darkred",
+            fontweight="bold",
+            bbox=_BOX,
+            zorder=8,
+        )
+        (self.end_point,) = ax.plot(
+            [],
+            [],
+            "o",
+            markersize=12,
+            markeredgecolor="darkgreen",
+            markerfacecolor="green",
+            markeredgewidth=2,
+            zorder=7,
+        )
+        self.end_text = ax.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(0, 0),
+            fontsize=12,
+            color="darkgreen",
+            fontweight="bold",
+            arrowprops=dict(
+                arrowstyle="->", color="darkgreen", alpha=0.8, linewidth=1.5
+            ),
+            bbox=dict(
+                boxstyle="round,pad=0.4",
+                facecolor="white",
+                alpha=0.95,
+                edgecolor="green",
+            ),
+            zorder=8,
+        )
+        (self.key_points,) = ax.plot([], [], "g.", markersize=8, alpha=0.7, zorder=6)
+
+    def render(self, job):
+        """Подставляет данные задания в готовые артисты"""
+        t = np.asarray(job["times"])
+        v = np.asarray(job["speeds"])
+        t_end = job.get("t_end", 150)
+
+        self.ax.set_title(job.get("title", ""), fontsize=16, fontweight="bold", pad=20)
+        v_max = job.get("v_max", 2000)
+        if self.ax.get_ylim()[1] != v_max:
+            self.ax.set_ylim(0, v_max)
+            self.ax.set_yticks(np.arange(0, v_max + 1, 250))
+            self.ax.set_yticks(np.arange(0, v_max + 1, 50), minor=True)
+        self.line.set_data(t, v)
+        self.line.set_label(job.get("label", "Скорость ракеты"))
+
+        if "ideal_times" in job:
+            self.ideal.set_data(job["ideal_times"], job["ideal_speeds"])
+            self.ideal.set_label("Идеальная скорость (формула Циолковского)")
+            self.ideal.set_visible(True)
+        else:
+            self.ideal.set_visible(False)
+            self.ideal.set_label("_nolegend_")
+
+        t_sep = job.get("t_sep")
+        has_sep = t_sep is not None and len(t) > 0
+        for artist in (
+            self.boost_zone,
+            self.main_zone,
+            self.sep_line,
+            self.sep_point,
+            self.sep_text,
+        ):
+            artist.set_visible(has_sep)
+        self.boost_zone.set_label(
+            "4 ускорителя (основной выключен)" if has_sep else "_nolegend_"
+        )
+        self.main_zone.set_label(
+            "Только основной двигатель" if has_sep else "_nolegend_"
+        )
+        if has_sep:
+            self.boost_zone.set_width(t_sep)
+            self.main_zone.set_x(t_sep)
+            self.main_zone.set_width(t_end - t_sep)
+            self.sep_line.set_xdata([t_sep, t_sep])
+            i = nearest_index(t, t_sep)
+            self.sep_point.set_data([t[i]], [v[i]])
+            self.sep_text.set_position((t[i] + 2, v[i] + 80))
+            self.sep_text.set_text(f"{v[i]:.0f} м/с")
+
+        if len(t) > 0:
+            i = nearest_index(t, t_end)
+            self.end_point.set_data([t[i]], [v[i]])
+            self.end_text.xy = (t[i], v[i])
+            self.end_text.set_position((t[i] - 30, v[i] + 120))
+            self.end_text.set_text(f"{t_end:.0f} с: {v[i]:.0f} м/с")
+            idx = [nearest_index(t, k) for k in self.KEY_TIMES if k <= t[-1]]
+            self.key_points.set_data(t[idx], v[idx])
+        self.end_point.set_visible(len(t) > 0)
+        self.end_text.set_visible(len(t) > 0)
+
+        self.ax.legend(loc="lower right", fontsize=12, framealpha=0.95)
+
+
+class SpeedHeightTemplate:
+    """Шаблон графика v(h): линия скорости и подписи ключевых высот"""
+
+    KEY_HEIGHTS = [10, 20, 30, 40, 50, 60]
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(12, 8))
+        ax = self.ax = self.fig.add_subplot()
+        style_speed_height(ax, "")
+
+        (self.line,) = ax.plot([], [], "b-", linewidth=3.0)
+        (self.key_points,) = ax.plot([], [], "ro", markersize=6, alpha=0.7)
+        self.key_texts = [
+            ax.text(
+                0,
+                0,
+                "",
+                fontsize=9,
+                color="red",
+                alpha=0.8,
+                bbox=dict(boxstyle="round,pad=0.2", facecolor="white", alpha=0.8),
+            )
+            for _ in self.KEY_HEIGHTS
+        ]
+
+    def render(self, job):
+        """Подставляет данные задания в готовые артисты"""
+        v = np.asarray(job["speeds"])
+        h_km = np.asarray(job["altitudes"]) / 1000
+
+        self.ax.set_title(job.get("title", ""), fontsize=16, fontweight="bold")
+        self.line.set_data(v, h_km)
+        self.line.set_label(job.get("label", "Скорость ракеты"))
+
+        xs, ys = [], []
+        for text, h_key in zip(self.key_texts, self.KEY_HEIGHTS):
+            text.set_visible(False)
+            if len(h_km) == 0 or h_key > h_km.max():
+                continue
+            i = nearest_index(h_km, h_key)
+            if 0 <= v[i] <= 1200:
+                xs.append(v[i])
+                ys.append(h_km[i])
+                text.set_position((v[i] + 10, h_km[i] + 1))
+                text.set_text(f"{h_key} км: {v[i]:.0f} м/с")
+                text.set_visible(True)
+        self.key_points.set_data(xs, ys)
+
+        self.ax.legend(loc="lower right", fontsize=12, framealpha=0.95)
+
+
+TEMPLATES = {
+    "speed_time": SpeedTimeTemplate,
+    "speed_height": SpeedHeightTemplate,
+}
+
+# Шаблоны, уже построенные в текущем процессе
+_built = {}
+
+
+def _get_template(kind):
+    if kind not in _built:
+        _built[kind] = TEMPLATES[kind]()
+    return _built[kind]
+
+
+def render_job(job):
+    """Отрисовывает одно задание; возвращает список сохранённых файлов"""
+    template = _get_template(job["kind"])
+    template.render(job)
+
+    os.makedirs(os.path.dirname(job["out"]) or ".", exist_ok=True)
+    saved = []
+    for fmt in job.get("formats", ("png",)):
+        filename = f"{job['out']}.{fmt}"
+        template.fig.savefig(filename, dpi=job.get("dpi", 300), bbox_inches="tight")
+        saved.append(filename)
+    return saved
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_batch(jobs, workers=None, formats=("png",), dpi=300):
+    """Отрисовывает пакет заданий в пуле процессов"""
+    jobs = [
+        dict(job, formats=job.get("formats", formats), dpi=job.get("dpi", dpi))
+        for job in jobs
+    ]
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker()
+        return [path for job in jobs for path in render_job(job)]
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx, initializer=_init_worker
+    ) as pool:
+        # Крупные порции, чтобы каждый процесс переиспользовал свои шаблоны
+        chunk = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        results = pool.map(render_job, jobs, chunksize=chunk)
+        return [path for saved in results for path in saved]
+
+
+# ============================================================================
+# АРХИВ ПОЛЁТОВ
+# ============================================================================
+
+
+def save_flight(times, altitudes, speeds, thrusts, name=None, **extra):
+    """Сохраняет телеметрию полёта в архив ksp_flights/"""
+    os.makedirs(FLIGHTS_DIR, exist_ok=True)
+    if name is None:
+        from datetime import datetime
+
+        name = "flight_" + datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(FLIGHTS_DIR, f"{name}.npz")
+    np.savez(
+        filename,
+        times=times,
+        altitudes=altitudes,
+        speeds=speeds,
+        thrusts=thrusts,
+        **extra,
+    )
+    return filename
+
+
+def load_flight(filename):
+    """Загружает телеметрию полёта из архива"""
+    with np.load(filename) as data:
+        return {key: data[key] for key in data.files}
+
+
+def flight_jobs(filename, out_dir=GRAPHS_DIR):
+    """Задания v(t) и v(h) для одного записанного полёта"""
+    flight = load_flight(filename)
+    name = os.path.splitext(os.path.basename(filename))[0]
+    common = dict(
+        times=flight["times"],
+        speeds=flight["speeds"],
+        altitudes=flight["altitudes"],
+        label="Скорость ракеты (KSP)",
+    )
+    if "t_sep" in flight:
+        common["t_sep"] = float(flight["t_sep"])
+    return [
+        dict(
+            common,
+            kind="speed_time",
+            out=os.path.join(out_dir, f"speed_vs_time_{name}"),
+            v_max=1800,
+            title="График зависимости скорости ракеты от времени\n"
+            "(Экспериментальные данные KSP)",
+        ),
+        dict(
+            common,
+            kind="speed_height",
+            out=os.path.join(out_dir, f"speed_vs_height_{name}"),
+            title="Зависимость скорости от высоты\n(Экспериментальные данные KSP)",
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная отрисовка графиков полётов")
+    parser.add_argument("flights", nargs="*", help="файлы .npz из ksp_flights/")
+    parser.add_argument("--format", nargs="+", default=["png"], dest="formats")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--out", default=GRAPHS_DIR)
+    args = parser.parse_args()
+
+    flights = args.flights or sorted(glob.glob(os.path.join(FLIGHTS_DIR, "*.npz")))
+    if not flights:
+        print("Нет записанных полётов")
+        return
+
+    jobs = [job for f in flights for job in flight_jobs(f, args.out)]
+    print(f"Полётов: {len(flights)}, графиков: {len(jobs)}")
+    saved = render_batch(jobs, args.workers, tuple(args.formats), args.dpi)
+    print(f"✓ Сохранено файлов: {len(saved)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Воспроизведение записанных полётов через логику управления быстрее
+реального времени.
+
+Записанная телеметрия (архив ksp_flights/*.npz) подаётся в тот же код, что
+летает в KSP: ReplayTelemetry повторяет интерфейс TelemetryStreams,
+AscentGuidance решает, какие команды отдать, CommandOutput отсекает
+повторы по часам записи. Вместо корабля команды принимает CommandRecorder
+и пишет их в журнал, поэтому видно, что отправил бы автопилот с
+изменённой программой. Пауз нет - полёт из ~1500 отсчётов проходит за
+миллисекунды, сотни записей - за секунды.
+
+    python ksp_replay.py                      # все полёты архива
+    python ksp_replay.py --program new.json   # сравнить с новой программой
+
+Для изменений самого закона управления (не только параметров) в
+replay_flight передаётся свой класс guidance с интерфейсом AscentGuidance.
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from ksp_ascent import AscentGuidance, AscentProgram, detect_separation
+from ksp_control import CommandOutput
+from ksp_plot import FLIGHTS_DIR, load_flight
+from ksp_sampling import resample_uniform
+
+# Массивы, без которых полёт воспроизвести нельзя (старые записи без
+# горизонтальной скорости и ступени пропускаются)
+REPLAY_ARRAYS = ("times", "altitudes", "speeds", "h_speeds", "thrusts", "stages")
+
+
+class ReplayTelemetry:
+    """Телеметрия из записи с интерфейсом TelemetryStreams"""
+
+    def __init__(self, flight):
+        self.index = 0
+        self._t = flight["times"].tolist()
+        self._altitude = flight["altitudes"].tolist()
+        self._speed = flight["speeds"].tolist()
+        self._h_speed = flight["h_speeds"].tolist()
+        self._thrust = flight["thrusts"].tolist()
+        self._stage = flight["stages"].tolist()
+
+    def __len__(self):
+        return len(self._t)
+
+    def now(self):
+        return self._t[self.index]
+
+    def altitude(self):
+        return self._altitude[self.index]
+
+    def surface_altitude(self):
+        # Не записывается; над стартовым столом совпадает с высотой
+        return self._altitude[self.index]
+
+    def speed(self):
+        return self._speed[self.index]
+
+    def h_speed(self):
+        return self._h_speed[self.index]
+
+    def thrust(self):
+        return self._thrust[self.index]
+
+    def stage(self):
+        return self._stage[self.index]
+
+
+class CommandRecorder:
+    """Подставной корабль: команды не отправляются, а пишутся в журнал"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.log = []  # (время, команда, значение)
+        # CommandOutput берёт vessel.auto_pilot и vessel.control
+        self.auto_pilot = self
+        self.control = self
+
+    def target_pitch_and_heading(self, pitch, heading):
+        self.log.append((self.clock(), "attitude", pitch))
+
+    @property
+    def throttle(self):
+        return None
+
+    @throttle.setter
+    def throttle(self, value):
+        self.log.append((self.clock(), "throttle", value))
+
+    def activate_next_stage(self):
+        self.log.append((self.clock(), "stage", None))
+
+    def commands(self, kind):
+        """Времена и значения команд одного вида"""
+        return [(t, value) for t, name, value in self.log if name == kind]
+
+
+def replay_flight(flight, program, guidance=AscentGuidance):
+    """
+    Прогон записи через логику управления.
+
+    Возвращает словарь: журнал команд (log), счётчики CommandOutput
+    (sent/suppressed), времена команд отделения (staging) и время
+    отделения ускорителей (t_sep): из записанных скачков массы, а для
+    старых записей без массы - по детектору падения тяги.
+    """
+    telemetry = ReplayTelemetry(flight)
+    recorder = CommandRecorder(telemetry.now)
+    commands = CommandOutput(recorder, clock=telemetry.now)
+    control = guidance(program, commands)
+
+    # Первый отсчёт записан уже после команды старта: ступень до старта на
+    # единицу больше. С записанной ступенью CommandOutput принял бы
+    # отделение на выгорании за повтор стартовой команды и подавил его
+    control.launch(telemetry.stage() + 1)
+    for i in range(len(telemetry)):
+        telemetry.index = i
+        altitude = telemetry.altitude()
+        if control.finished(telemetry.now(), altitude):
+            break
+        control.update(
+            telemetry.now(),
+            altitude,
+            telemetry.h_speed(),
+            telemetry.thrust(),
+            telemetry.stage(),
+        )
+
+    t_sep = None
+    separations = flight.get("separations", np.empty((0, 2)))
+    if len(separations):
+        t_sep = float(separations[0][0])
+    elif len(flight["times"]) > 1:
+        # Детектор падения тяги работает на равномерной сетке
+        times, thrusts = resample_uniform(flight["times"], 0.1, flight["thrusts"])
+        i = detect_separation(thrusts)
+        if i is not None:
+            t_sep = float(times[i])
+
+    return dict(
+        log=recorder.log,
+        sent=dict(commands.sent),
+        suppressed=dict(commands.suppressed),
+        staging=[t for t, _ in recorder.commands("stage")],
+        t_sep=t_sep,
+    )
+
+
+def attitude_difference(log_a, log_b, times):
+    """Наибольшая разница заданного тангажа двух журналов на сетке times"""
+
+    def pitch_on(log):
+        rows = [(t, value) for t, name, value in log if name == "attitude"]
+        if not rows:
+            return np.full(len(times), np.nan)
+        t, pitch = np.array(rows).T
+        # Заданный тангаж держится до следующей команды
+        i = np.searchsorted(t, times, side="right") - 1
+        return np.where(i >= 0, pitch[np.maximum(i, 0)], np.nan)
+
+    diff = np.abs(pitch_on(log_a) - pitch_on(log_b))
+    return float(np.nanmax(diff)) if np.any(~np.isnan(diff)) else 0.0
+
+
+def recorded_program(flight):
+    """Программа, с которой летел полёт (кампании её сохраняют)"""
+    if "program" in flight:
+        return AscentProgram.from_dict(json.loads(str(flight["program"])))
+    return AscentProgram()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных полётов")
+    parser.add_argument("flights", nargs="*", help="файлы .npz из ksp_flights/")
+    parser.add_argument(
+        "--program", default=None, help="JSON с параметрами новой программы полёта"
+    )
+    parser.add_argument("--log", default=None, help="сохранить журналы команд в JSON")
+    args = parser.parse_args()
+
+    files = args.flights or sorted(glob.glob(os.path.join(FLIGHTS_DIR, "*.npz")))
+    new_program = None
+    if args.program:
+        with open(args.program, encoding="utf-8") as f:
+            new_program = AscentProgram.from_dict(json.load(f))
+
+    print(f"{'Полёт':40} {'Ориент.':>7} {'Ступени, с':>18} {'Отдел., с':>9}", end="")
+    print(f" {'Δтангаж':>8}" if new_program else "")
+
+    started = time.perf_counter()
+    logs = {}
+    replayed = 0
+    samples = 0
+    for filename in files:
+        flight = load_flight(filename)
+        name = os.path.splitext(os.path.basename(filename))[0]
+        if any(key not in flight for key in REPLAY_ARRAYS):
+            print(f"{name[:40]:40} пропущен: нет h_speeds/stages")
+            continue
+
+        program = recorded_program(flight)
+        result = replay_flight(flight, new_program or program)
+        replayed += 1
+        samples += len(flight["times"])
+        logs[name] = result["log"]
+
+        staging = ", ".join(f"{t:.1f}" for t in result["staging"]) or "-"
+        t_sep = f"{result['t_sep']:.1f}" if result["t_sep"] is not None else "-"
+        line = (
+            f"{name[:40]:40} {result['sent']['attitude']:7d} {staging:>18} {t_sep:>9}"
+        )
+        if new_program:
+            base = replay_flight(flight, program)
+            diff = attitude_difference(base["log"], result["log"], flight["times"])
+            line += f" {diff:7.1f}°"
+        print(line)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"\nВоспроизведено полётов: {replayed}, отсчётов: {samples}, "
+        f"за {elapsed:.2f} с"
+    )
+
+    if args.log:
+        with open(args.log, "w", encoding="utf-8") as f:
+            json.dump(logs, f, indent=1)
+        print(f"✓ Журналы команд: {args.log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Пересборка набора графиков только по изменившимся входам.
+
+Для каждого графика записывается, от чего он зависит:
+
+- графики-теории (скрипты "график скорости от времени/высоты") - текст
+  скрипта (там параметры ракеты и моделирования) и всех модулей из этой
+  папки, которые он импортирует прямо или через другие модули (ksp_sim,
+  ksp_atmosphere, ksp_pitch, ksp_plot...), версия оформления STYLE_VERSION;
+- графики записанных полётов (ksp_graphs/speed_vs_*_<полёт>) - файл
+  полёта из ksp_flights/, STYLE_VERSION, разрешение и форматы.
+
+Отпечаток входов хранится в ksp_graphs/manifest.json. При следующем запуске
+перерисовываются только графики, у которых отпечаток изменился или нет
+файла. Скрипты-теории запускаются отдельными процессами, графики полётов
+рисуются пулом render_batch - всё одновременно.
+
+Хэш содержимого файла пересчитывается, только если изменились размер или
+время изменения - проверка сотен полётов занимает миллисекунды.
+
+    python ksp_report.py              # только изменившиеся
+    python ksp_report.py --force      # всё заново
+    python ksp_report.py --dry-run    # показать, что устарело
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from ksp_plot import FLIGHTS_DIR, GRAPHS_DIR, STYLE_VERSION, flight_jobs, render_batch
+
+MANIFEST = os.path.join(GRAPHS_DIR, "manifest.json")
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Строка импорта модуля: "import ksp_sim", "from ksp_sim import ..."
+IMPORT_LINE = re.compile(r"^\s*(?:from|import)\s+(\w+)", re.MULTILINE)
+
+# Скрипты-теории и их графики
+SCRIPT_FIGURES = {
+    "график скорости от времени.py": "график_скорость_время_150с.png",
+    "график скорости от высоты.py": "график_скорость_от_высоты_теория.png",
+}
+
+
+class FileHashes:
+    """Хэши содержимого файлов с кэшем по размеру и времени изменения"""
+
+    def __init__(self, cache=None):
+        self.cache = dict(cache or {})  # путь -> [размер, mtime_ns, sha1]
+
+    def __call__(self, path):
+        stat = os.stat(path)
+        cached = self.cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.cache[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return self.cache[path][2]
+
+
+def local_imports(script):
+    """
+    Скрипт и модули из CODE_DIR, которые он импортирует, с импортами этих
+    модулей. Список входов выводится из кода, поэтому новый модуль движка
+    не нужно вписывать вручную.
+    """
+    found = {script}
+    pending = [script]
+    while pending:
+        with open(pending.pop(), encoding="utf-8") as f:
+            names = IMPORT_LINE.findall(f.read())
+        for name in names:
+            path = os.path.join(CODE_DIR, name + ".py")
+            if path not in found and os.path.exists(path):
+                found.add(path)
+                pending.append(path)
+    return [script] + sorted(found - {script})
+
+
+def fingerprint(hashes, inputs, params):
+    """Отпечаток графика: хэши входных файлов и параметры отрисовки"""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode())
+    for path in inputs:
+        digest.update(f"{os.path.basename(path)}={hashes(path)};".encode())
+    return digest.hexdigest()
+
+
+def collect_targets(flights, out_dir, dpi, formats):
+    """
+    Цели сборки: словари name, kind ("script"/"flight"), inputs, params,
+    outputs. Для полёта одна цель - оба его графика.
+    """
+    targets = []
+    for script, figure in SCRIPT_FIGURES.items():
+        script = os.path.join(CODE_DIR, script)
+        targets.append(
+            dict(
+                name=figure,
+                kind="script",
+                script=script,
+                inputs=local_imports(script),
+                params=dict(style=STYLE_VERSION),
+                outputs=[figure],
+            )
+        )
+    for filename in flights:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        outputs = [
+            os.path.join(out_dir, f"speed_vs_{kind}_{name}.{fmt}")
+            for kind in ("time", "height")
+            for fmt in formats
+        ]
+        targets.append(
+            dict(
+                name=name,
+                kind="flight",
+                flight=filename,
+                inputs=[filename],
+                params=dict(style=STYLE_VERSION, dpi=dpi, formats=list(formats)),
+                outputs=outputs,
+            )
+        )
+    return targets
+
+
+def load_manifest(filename=MANIFEST):
+    try:
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"files": {}, "figures": {}}
+
+
+def save_manifest(manifest, filename=MANIFEST):
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    tmp = filename + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, filename)
+
+
+def stale_targets(targets, manifest, hashes, force=False):
+    """Цели с изменившимися входами или без выходных файлов"""
+    stale = []
+    for target in targets:
+        target["fingerprint"] = fingerprint(hashes, target["inputs"], target["params"])
+        known = manifest["figures"].get(target["name"])
+        if (
+            force
+            or known != target["fingerprint"]
+            or not all(os.path.exists(path) for path in target["outputs"])
+        ):
+            stale.append(target)
+    return stale
+
+
+def _start_script(target):
+    """Скрипт-теория в отдельном процессе с неинтерактивным бэкендом"""
+    env = dict(os.environ, MPLBACKEND="Agg")
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (CODE_DIR, env.get("PYTHONPATH")) if p
+    )
+    return subprocess.Popen(
+        [sys.executable, target["script"]],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def build(targets, workers=None, dpi=300, formats=("png",), out_dir=GRAPHS_DIR):
+    """Перерисовывает цели; возвращает список успешно собранных"""
+    # Скрипты работают сами по себе, пока пул рисует графики полётов
+    running = [(t, _start_script(t)) for t in targets if t["kind"] == "script"]
+
+    flights = [t for t in targets if t["kind"] == "flight"]
+    done = []
+    if flights:
+        jobs = [job for t in flights for job in flight_jobs(t["flight"], out_dir)]
+        render_batch(jobs, workers, tuple(formats), dpi)
+        done.extend(flights)
+
+    for target, process in running:
+        output, _ = process.communicate()
+        if process.returncode == 0:
+            done.append(target)
+        else:
+            print(f"✗ {target['name']}: скрипт завершился с ошибкой")
+            print(output.decode(errors="replace")[-2000:])
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересборка изменившихся графиков")
+    parser.add_argument("flights", nargs="*", help="файлы .npz из ksp_flights/")
+    parser.add_argument("--force", action="store_true", help="перерисовать всё")
+    parser.add_argument("--dry-run", action="store_true", help="только показать")
+    parser.add_argument("--format", nargs="+", default=["png"], dest="formats")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--out", default=GRAPHS_DIR)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    flights = args.flights or sorted(glob.glob(os.path.join(FLIGHTS_DIR, "*.npz")))
+    manifest_file = os.path.join(args.out, os.path.basename(MANIFEST))
+    manifest = load_manifest(manifest_file)
+    hashes = FileHashes(manifest["files"])
+
+    targets = collect_targets(flights, args.out, args.dpi, args.formats)
+    stale = stale_targets(targets, manifest, hashes, args.force)
+    checked = time.perf_counter() - started
+    print(
+        f"Графиков: {sum(len(t['outputs']) for t in targets)}, "
+        f"устарело: {sum(len(t['outputs']) for t in stale)} "
+        f"(проверка {checked * 1000:.0f} мс)"
+    )
+    if args.dry_run:
+        for target in stale:
+            print(f"- {target['name']}")
+        return
+    if not stale:
+        print("✓ Всё актуально")
+        return
+
+    done = build(stale, args.workers, args.dpi, args.formats, args.out)
+    for target in done:
+        manifest["figures"][target["name"]] = target["fingerprint"]
+    # Кэш хэшей - только для файлов, которые ещё существуют
+    manifest["files"] = {
+        path: value for path, value in hashes.cache.items() if os.path.exists(path)
+    }
+    save_manifest(manifest, manifest_file)
+    print(
+        f"✓ Перерисовано: {sum(len(t['outputs']) for t in done)} файлов "
+        f"за {time.perf_counter() - started:.1f} с"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Учёт и профилирование вызовов kRPC.
+
+RpcProfiler подменяет метод _invoke у объекта подключения: каждый вызов
+процедуры (чтение свойства, команда автопилоту) считается по имени
+процедуры, его длительность попадает в гистограмму, а вызовы привязываются
+к итерациям цикла полёта через tick(). В конце полёта summary() печатает
+число вызовов на итерацию, p50/p99 задержки и самые дорогие процедуры.
+
+    conn = krpc.connect(name="KSP_Telemetry")
+    profiler = RpcProfiler(conn)
+    while ...:
+        ...
+        profiler.tick()
+    profiler.summary()
+"""
+
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# Границы корзин гистограммы задержек, мкс (степени двойки)
+_BUCKETS_US = [2**k for k in range(6, 19)]
+
+
+def _bucket(latency_us):
+    for i, edge in enumerate(_BUCKETS_US):
+        if latency_us < edge:
+            return i
+    return len(_BUCKETS_US)
+
+
+class RpcProfiler:
+    """Счётчики и гистограммы задержек вызовов kRPC по процедурам"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.counts = defaultdict(int)
+        self.totals = defaultdict(float)  # суммарное время по процедурам, с
+        self.latencies = defaultdict(list)  # задержки по процедурам, с
+        self.histogram = [0] * (len(_BUCKETS_US) + 1)
+        self.calls_per_tick = []
+        self._tick_calls = 0
+
+        self._invoke = conn._invoke
+        conn._invoke = self._profiled_invoke
+
+    def _profiled_invoke(self, service, procedure, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._invoke(service, procedure, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            name = f"{service}.{procedure}"
+            self.counts[name] += 1
+            self.totals[name] += elapsed
+            self.latencies[name].append(elapsed)
+            self.histogram[_bucket(elapsed * 1e6)] += 1
+            self._tick_calls += 1
+
+    def tick(self):
+        """Отмечает конец итерации цикла полёта"""
+        self.calls_per_tick.append(self._tick_calls)
+        self._tick_calls = 0
+
+    def detach(self):
+        """Возвращает подключению исходный _invoke"""
+        self.conn._invoke = self._invoke
+
+    def summary(self, top=10):
+        """Печатает сводку по вызовам kRPC"""
+        total_calls = sum(self.counts.values())
+        if total_calls == 0:
+            print("\nkRPC: вызовов не было")
+            return
+
+        all_latencies = np.concatenate([np.asarray(v) for v in self.latencies.values()])
+        p50, p99 = np.percentile(all_latencies, [50, 99]) * 1000
+
+        print("\n" + "=" * 60)
+        print("ПРОФИЛЬ ВЫЗОВОВ kRPC:")
+        print("=" * 60)
+        print(f"- Вызовов всего: {total_calls}")
+        if self.calls_per_tick:
+            per_tick = np.array(self.calls_per_tick)
+            print(
+                f"- Вызовов за итерацию: в среднем {per_tick.mean():.1f}, "
+                f"макс {per_tick.max()} ({len(per_tick)} итераций)"
+            )
+        print(f"- Задержка: p50 {p50:.2f} мс, p99 {p99:.2f} мс")
+        print(f"- Суммарно в kRPC: {all_latencies.sum():.2f} с")
+
+        print(f"\nСамые дорогие процедуры (топ-{top} по суммарному времени):")
+        print(f"{'Процедура':48} {'Вызовов':>8} {'Всего, с':>9} {'p99, мс':>8}")
+        ranked = sorted(self.totals, key=self.totals.get, reverse=True)[:top]
+        for name in ranked:
+            p99_name = np.percentile(self.latencies[name], 99) * 1000
+            print(
+                f"{name[:48]:48} {self.counts[name]:8d} "
+                f"{self.totals[name]:9.3f} {p99_name:8.2f}"
+            )
+
+        print("\nГистограмма задержек:")
+        peak = max(self.histogram)
+        lower = 0
+        for i, count in enumerate(self.histogram):
+            upper = _BUCKETS_US[i] if i < len(_BUCKETS_US) else None
+            if count:
+                label = f"{lower}-{upper} мкс" if upper else f">{lower} мкс"
+                bar = "#" * max(1, round(40 * count / peak))
+                print(f"{label:>18} {count:7d} {bar}")
+            lower = upper
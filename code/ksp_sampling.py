@@ -0,0 +1,106 @@
+"""
+Адаптивная частота сбора телеметрии по фазам полёта.
+
+Вместо постоянного time.sleep() цикл полёта спрашивает у AdaptiveSampler
+период до следующего отсчёта. Возле событий (падение тяги, смена ступени,
+малая высота над поверхностью, быстрое снижение) частота
+повышается и держится повышенной hold секунд, на пассивных участках
+(двигатель выключен) - понижается.
+
+Каждый отсчёт записывается вместе со своей частотой, поэтому при анализе
+нужно учитывать неравномерный шаг: resample_uniform() переводит записи
+на равномерную сетку для свёрток и поиска по индексам.
+"""
+
+import numpy as np
+
+
+class AdaptiveSampler:
+    """Политика частоты отсчётов телеметрии"""
+
+    def __init__(
+        self,
+        base_period=0.1,  # обычный полёт с работающим двигателем, с
+        fast_period=0.02,  # возле событий, с
+        slow_period=0.5,  # пассивный полёт, с
+        hold=2.0,  # сколько держать высокую частоту после события, с
+        thrust_drop=0.3,  # относительное падение тяги за отсчёт
+        low_altitude=1000.0,  # малая высота над поверхностью, м
+        high_vertical_speed=100.0,  # скорость снижения у земли, м/с
+    ):
+        self.base_period = base_period
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.hold = hold
+        self.thrust_drop = thrust_drop
+        self.low_altitude = low_altitude
+        self.high_vertical_speed = high_vertical_speed
+
+        self.period = fast_period
+        self.reason = "старт"
+        self.events = 0
+        self._fast_until = hold
+        self._prev = None  # (t, thrust, stage, surface_altitude)
+
+    @property
+    def rate(self):
+        """Текущая частота отсчётов, Гц"""
+        return 1.0 / self.period
+
+    def update(self, t, thrust, stage, surface_altitude, vertical_speed=None):
+        """Учитывает новый отсчёт и возвращает период до следующего, с"""
+        prev = self._prev
+        self._prev = (t, thrust, stage, surface_altitude)
+
+        if vertical_speed is None:
+            # Оцениваем по разности высот, чтобы не делать лишний RPC
+            if prev is not None and t > prev[0]:
+                vertical_speed = (surface_altitude - prev[3]) / (t - prev[0])
+            else:
+                vertical_speed = 0.0
+
+        reason = None
+        if (
+            prev is not None
+            and prev[1] > 0
+            and thrust < prev[1] * (1 - self.thrust_drop)
+        ):
+            reason = "падение тяги"
+        elif prev is not None and stage != prev[2]:
+            reason = "смена ступени"
+        elif surface_altitude < self.low_altitude:
+            reason = "малая высота"
+        elif (
+            vertical_speed < -self.high_vertical_speed
+            and surface_altitude < self.low_altitude * 5
+        ):
+            reason = "быстрое снижение"
+
+        if reason is not None:
+            if t >= self._fast_until:
+                self.events += 1
+            self._fast_until = t + self.hold
+            self.reason = reason
+
+        if t < self._fast_until:
+            self.period = self.fast_period
+        elif thrust > 0:
+            self.period = self.base_period
+            self.reason = "активный участок"
+        else:
+            self.period = self.slow_period
+            self.reason = "пассивный участок"
+        return self.period
+
+
+def resample_uniform(times, dt, *series):
+    """
+    Переводит неравномерные отсчёты на равномерную сетку с шагом dt.
+
+    Возвращает (сетка_времени, ряд1, ряд2, ...) с линейной интерполяцией.
+    """
+    times = np.asarray(times, dtype=float)
+    if len(times) < 2:
+        return (times,) + tuple(np.asarray(s, dtype=float) for s in series)
+    grid = np.arange(times[0], times[-1] + dt / 2, dt)
+    return (grid,) + tuple(np.interp(grid, times, s) for s in series)
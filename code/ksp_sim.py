@@ -0,0 +1,527 @@
+"""
+Движок моделирования подъёма ракеты (уравнение Мещерского).
+
+Численное интегрирование методом Эйлера с шагом dt, как в исходных
+скриптах графиков. Пассивные участки выше атмосферы (двигатели выключены,
+сопротивления нет) не шагаются по 0.1 с, а перепрыгиваются аналитически:
+состояние переводится в орбиту вокруг Кербина и распространяется по
+Кеплеру (универсальная переменная) до следующего события - апоцентра,
+входа в атмосферу, включения следующей ступени или конца моделирования.
+После этого численное интегрирование продолжается.
+
+На активном участке модель плоская (высота h, горизонтальная vx и
+вертикальная vy скорости); на кеплеровском участке vx считается
+трансверсальной, а vy - радиальной скоростью на радиусе R + h.
+"""
+
+import math
+
+import numpy as np
+
+from ksp_atmosphere import ATMOSPHERE_HEIGHT, R, air_drag, g0
+from ksp_pitch import DEFAULT_PITCH, PitchProgram
+
+# Константы Кербина (радиус R, g0 и граница атмосферы - из ksp_atmosphere)
+MU = g0 * R**2  # гравитационный параметр, м³/с²
+rho0 = 1.223  # кг/м³
+H_atm = 5000.0  # м
+
+# Параметры ракеты: четыре ускорителя и основной двигатель (общие для
+# скриптов-теорий и суррогатной модели)
+M0 = 439000.0  # кг, стартовая масса
+F_b = 1515000.0  # Н (один ускоритель)
+F_m = 1443000.0  # Н (основной двигатель)
+Isp_b = 205.0  # с (ускорители)
+Isp_m = 275.0  # с (основной)
+m_boosters_with_fuel = 240000.0  # кг, ускорители с топливом
+m_fuel_stage1 = 118000.0  # кг, топливо основной ступени
+Cd = 0.25  # дозвуковой; выше - множитель Cd(M)
+A = 7.07  # м²
+
+# Точек записи на один кеплеровский участок
+COAST_SAMPLES = 50
+
+# Строк в одном блоке simulate_chunks
+CHUNK_SIZE = 4096
+
+# Потери скорости, накопленные с начала полёта, м/с: гравитационные
+# (g·sin γ), аэродинамические (D/m) и на управление (F/m·(1 - cos α), α -
+# угол между тягой и скоростью). Идеальная скорость ∫F/m dt равна скорости
+# плюс сумма потерь (с точностью шага интегрирования)
+LOSS_KEYS = ("loss_g", "loss_d", "loss_s")
+LOSS_NAMES = {
+    "loss_g": "Гравитационные потери",
+    "loss_d": "Аэродинамические потери",
+    "loss_s": "Потери на управление",
+}
+
+# Поля состояния в результатах моделирования
+STATE_KEYS = ("t", "v", "h", "m", "vx", "vy") + LOSS_KEYS
+
+# Причины остановки моделирования
+STOP_REASONS = {
+    "time": "достигнуто максимальное время",
+    "altitude": "достигнута высота",
+    "fuel": "топливо на исходе",
+    "apoapsis": "апоцентр",
+    "orbit": "замкнутая орбита без событий",
+    "crash": "падение",
+}
+
+
+# Функции
+def rho_exp(h):
+    """Плотность в прежней экспоненциальной модели (atmosphere="exp"), кг/м³"""
+    return rho0 * math.exp(-h / H_atm)
+
+
+def gravity(h):
+    return g0 * (R / (R + h)) ** 2
+
+
+# Программа тангажа по умолчанию - та же, что летит AscentProgram()
+get_pitch = DEFAULT_PITCH
+
+
+class Stage:
+    """Участок работы двигателей с постоянной тягой и расходом"""
+
+    def __init__(self, thrust, mdot, duration, start_mass=None):
+        self.thrust = thrust  # Н (0 - пассивный участок)
+        self.mdot = mdot  # кг/с
+        self.duration = duration  # с
+        self.start_mass = start_mass  # масса в начале участка (сброс ступени), кг
+
+
+def rocket_stages():
+    """
+    Участки подъёма ракеты M0: сначала только четыре ускорителя до
+    выгорания, затем основной двигатель после сброса ускорителей
+    """
+    mdot_4b = F_b / (Isp_b * g0) * 4
+    mdot_m = F_m / (Isp_m * g0)
+    return [
+        Stage(4 * F_b, mdot_4b, m_boosters_with_fuel / mdot_4b),
+        Stage(
+            F_m,
+            mdot_m,
+            m_fuel_stage1 / mdot_m,
+            start_mass=M0 - m_boosters_with_fuel,
+        ),
+    ]
+
+
+# ============================================================================
+# КЕПЛЕРОВСКИЙ УЧАСТОК
+# ============================================================================
+
+
+def _stumpff(z):
+    """Функции Штумпфа C(z), S(z)"""
+    if z > 1e-8:
+        sz = math.sqrt(z)
+        return (1 - math.cos(sz)) / z, (sz - math.sin(sz)) / (sz * z)
+    if z < -1e-8:
+        sz = math.sqrt(-z)
+        return (math.cosh(sz) - 1) / -z, (math.sinh(sz) - sz) / (sz * -z)
+    return 0.5, 1.0 / 6.0
+
+
+def kepler_propagate(r0, vr0, vt0, dt):
+    """
+    Состояние через dt секунд полёта по Кеплеру.
+
+    r0 - радиус, vr0/vt0 - радиальная и трансверсальная скорости.
+    Возвращает (r, vr, vt).
+    """
+    if dt == 0:
+        return r0, vr0, vt0
+    sqrt_mu = math.sqrt(MU)
+    alpha = 2 / r0 - (vr0 * vr0 + vt0 * vt0) / MU  # 1/a
+
+    # Уравнение Кеплера в универсальной переменной, метод Ньютона
+    chi = sqrt_mu * abs(alpha) * dt if alpha > 1e-12 else sqrt_mu * dt / r0
+    for _ in range(50):
+        z = alpha * chi * chi
+        c, s = _stumpff(z)
+        f = (
+            r0 * vr0 / sqrt_mu * chi * chi * c
+            + (1 - alpha * r0) * chi**3 * s
+            + r0 * chi
+            - sqrt_mu * dt
+        )
+        df = (
+            r0 * vr0 / sqrt_mu * chi * (1 - z * s)
+            + (1 - alpha * r0) * chi * chi * c
+            + r0
+        )
+        step = f / df
+        chi -= step
+        if abs(step) < 1e-9:
+            break
+
+    z = alpha * chi * chi
+    c, s = _stumpff(z)
+    # Лагранжевы коэффициенты; r0 = (r0, 0), v0 = (vr0, vt0)
+    f = 1 - chi * chi / r0 * c
+    g = dt - chi**3 / sqrt_mu * s
+    x = f * r0 + g * vr0
+    y = g * vt0
+    r = math.hypot(x, y)
+    fdot = sqrt_mu / (r * r0) * (alpha * chi**3 * s - chi)
+    gdot = 1 - chi * chi / r * c
+    vx = fdot * r0 + gdot * vr0
+    vy = gdot * vt0
+    return r, (x * vx + y * vy) / r, (x * vy - y * vx) / r
+
+
+def kepler_events(r0, vr0, vt0):
+    """
+    Время до апоцентра и до входа в атмосферу на нисходящей ветви, с.
+
+    math.inf, если события нет (гиперболическая орбита, перицентр выше
+    атмосферы).
+    """
+    v2 = vr0 * vr0 + vt0 * vt0
+    alpha = 2 / r0 - v2 / MU
+    if alpha <= 0:
+        return math.inf, math.inf
+
+    a = 1 / alpha
+    h_ang = r0 * vt0  # удельный момент импульса
+    p = h_ang * h_ang / MU
+    e = math.sqrt(max(0.0, 1 - p / a))
+    if e < 1e-9:
+        return math.inf, math.inf
+    n = math.sqrt(MU / a**3)
+
+    def mean_anomaly(nu):
+        E = 2 * math.atan2(
+            math.sqrt(1 - e) * math.sin(nu / 2), math.sqrt(1 + e) * math.cos(nu / 2)
+        )
+        return E - e * math.sin(E)
+
+    nu0 = math.atan2(vr0 * h_ang / MU, p / r0 - 1)
+    M0 = mean_anomaly(nu0)
+    two_pi = 2 * math.pi
+
+    t_apo = ((math.pi - M0) % two_pi) / n
+
+    r_entry = R + ATMOSPHERE_HEIGHT
+    t_entry = math.inf
+    if a * (1 - e) < r_entry <= a * (1 + e):
+        cos_nu = min(max((p / r_entry - 1) / e, -1.0), 1.0)
+        nu_entry = -math.acos(cos_nu)  # нисходящая ветвь
+        t_entry = ((mean_anomaly(nu_entry) - M0) % two_pi) / n
+    return t_apo, t_entry
+
+
+# ============================================================================
+# МОДЕЛИРОВАНИЕ
+# ============================================================================
+
+
+def simulate_chunks(
+    stages,
+    m0,
+    dt=0.1,
+    t_max=None,
+    h_max=None,
+    m_min=None,
+    stop_at_apoapsis=False,
+    pitch=get_pitch,
+    coast=True,
+    curvature=False,
+    cd=Cd,
+    area=A,
+    atmosphere="table",
+    chunk=CHUNK_SIZE,
+):
+    """
+    Генератор моделирования подъёма: блоки состояния по мере расчёта.
+
+    Каждый блок - словарь массивов STATE_KEYS примерно по chunk строк
+    (кеплеровский участок добавляет до COAST_SAMPLES сверх) и полей "stop"
+    (причина остановки, None во всех блоках, кроме последнего) и "steps"
+    (число численных шагов к концу блока). Память ограничена одним блоком,
+    первый блок доступен сразу.
+
+    Потери скорости (LOSS_KEYS) интегрируются в том же шаге, что и
+    движение; на кеплеровском участке вся убыль скорости - гравитационная.
+    Пакетного (векторного по вариантам) прохода нет: варианты программы
+    тангажа сравниваются отдельными прогонами, параллельно в пуле процессов
+    (ksp_surrogate), и каждый несёт свои потери.
+
+    Моделирование останавливается по t_max, h_max, m_min (исчерпание
+    топлива), в апоцентре при stop_at_apoapsis или после выгорания всех
+    ступеней выше атмосферы. Причина остановки - в поле "stop",
+    число численных шагов - в поле "steps".
+
+    atmosphere="table" (по умолчанию) - табличная атмосфера Кербина и
+    Cd(M) из ksp_atmosphere (cd задаёт дозвуковое значение), "exp" -
+    прежняя экспонента rho_exp с H_atm и постоянный cd.
+
+    pitch - PitchProgram (считается по её таблице) или любая функция
+    (h, vx) -> тангаж в градусах.
+
+    curvature=True добавляет центробежное и кориолисово ускорения
+    (уравнения в полярных координатах) - нужно для полного подъёма до
+    апоцентра, где плоская модель не выводит ракету из атмосферы.
+    """
+    table = atmosphere == "table"
+    if isinstance(pitch, PitchProgram):
+        pitch = pitch.scalar
+    # Локальные имена - быстрее в горячем цикле
+    sqrt, cos, sin = math.sqrt, math.cos, math.sin
+    deg = math.pi / 180
+    drag_k = 0.5 * cd * area
+    stage_ends = np.cumsum([s.duration for s in stages]).tolist()
+
+    h = 0.0
+    vx = 0.0
+    vy = 0.0
+    m = m0
+    t = 0.0
+    idx = 0
+    loss_g = 0.0
+    loss_d = 0.0
+    loss_s = 0.0
+
+    columns = {key: [] for key in STATE_KEYS}
+    times = columns["t"]
+
+    # Связанные методы append - без поиска атрибута на каждом шаге
+    record_t = times.append
+    record_v = columns["v"].append
+    record_h = columns["h"].append
+    record_m = columns["m"].append
+    record_vx = columns["vx"].append
+    record_vy = columns["vy"].append
+    record_loss_g = columns["loss_g"].append
+    record_loss_d = columns["loss_d"].append
+    record_loss_s = columns["loss_s"].append
+
+    def block(stop=None):
+        arrays = {key: np.array(values) for key, values in columns.items()}
+        for values in columns.values():
+            values.clear()
+        return dict(arrays, stop=stop, steps=steps)
+
+    steps = 0
+    stop = "time"
+    while True:
+        if t_max is not None and t > t_max:
+            stop = "time"
+            break
+        if h_max is not None and h >= h_max:
+            stop = "altitude"
+            break
+
+        # Какие двигатели работают
+        while idx < len(stages) and t >= stage_ends[idx]:
+            idx += 1
+            if idx < len(stages) and stages[idx].start_mass is not None:
+                m = stages[idx].start_mass  # сбрасываем отработавшую ступень
+        if idx < len(stages):
+            F = stages[idx].thrust
+            mdot = stages[idx].mdot
+        else:
+            F = 0.0
+            mdot = 0.0
+
+        # Пассивный участок вне атмосферы - перепрыгиваем по Кеплеру
+        if coast and F == 0 and h >= ATMOSPHERE_HEIGHT:
+            r0 = R + h
+            t_apo, t_entry = kepler_events(r0, vy, vx)
+            if not stop_at_apoapsis or vy <= 0:
+                t_apo = math.inf
+            t_stage = stage_ends[idx] - t if idx < len(stages) else math.inf
+            t_end = t_max - t if t_max is not None else math.inf
+            jump = min(t_apo, t_entry, t_stage, t_end)
+            if jump == math.inf:
+                stop = "orbit"
+                break
+
+            # Точки дуги для графиков
+            vr0, vt0 = vy, vx
+            v_prev = math.hypot(vx, vy)
+            for k in range(1, COAST_SAMPLES + 1):
+                r, vy, vx = kepler_propagate(r0, vr0, vt0, jump * k / COAST_SAMPLES)
+                h = r - R
+                v = math.hypot(vx, vy)
+                loss_g += v_prev - v  # без тяги и сопротивления
+                v_prev = v
+                record_t(t + jump * k / COAST_SAMPLES)
+                record_v(v)
+                record_h(h)
+                record_m(m)
+                record_vx(vx)
+                record_vy(vy)
+                record_loss_g(loss_g)
+                record_loss_d(loss_d)
+                record_loss_s(loss_s)
+            t += jump
+            if len(times) >= chunk:
+                yield block()
+
+            if jump == t_stage:
+                t = stage_ends[idx]  # без ошибки округления на границе
+            if jump == t_apo:
+                stop = "apoapsis"
+                break
+            if jump == t_end:
+                stop = "time"
+                break
+            if jump == t_entry:
+                # Чуть ниже границы, чтобы не прыгать повторно
+                h = min(h, ATMOSPHERE_HEIGHT - 1e-6)
+            continue
+
+        # Угол тангажа
+        theta = pitch(h, vx) * deg
+        ct = cos(theta)
+        st = sin(theta)
+
+        # Полная скорость и её направление (на месте - по тяге)
+        if vx != 0 or vy != 0:
+            v = sqrt(vx * vx + vy * vy)
+            ux = vx / v
+            uy = vy / v
+        else:
+            v = 0
+            ux = ct
+            uy = st
+
+        # Атмосфера и сила сопротивления
+        if table:
+            rho, cd_mach = air_drag(h, v)
+            D = drag_k * rho * cd_mach * v * v
+        else:
+            rho = rho_exp(h) if h < ATMOSPHERE_HEIGHT else 0.0
+            D = 0.5 * rho * v * v * cd * area
+        g = g0 * (R / (R + h)) ** 2  # gravity(h) без вызова функции
+
+        # Ускорения (уравнение Мещерского)
+        inv_m = 1 / m
+        ax = (F * ct - D * ux) * inv_m
+        ay = (F * st - D * uy) * inv_m - g
+        if curvature:
+            r = R + h
+            ax -= vx * vy / r
+            ay += vx * vx / r
+
+        # Потери - проекции ускорений на направление скорости (центробежное
+        # и кориолисово перпендикулярны скорости и в потери не входят)
+        k = inv_m * dt
+        loss_g += g * uy * dt
+        loss_d += D * k
+        loss_s += F * k * (1 - ct * ux - st * uy)
+
+        # Интегрирование
+        vy_prev = vy
+        vx += ax * dt
+        vy += ay * dt
+        h += vy * dt
+        m -= mdot * dt
+        t += dt
+        steps += 1
+        record_t(t)
+        record_v(sqrt(vx * vx + vy * vy))
+        record_h(h)
+        record_m(m)
+        record_vx(vx)
+        record_vy(vy)
+        record_loss_g(loss_g)
+        record_loss_d(loss_d)
+        record_loss_s(loss_s)
+        if len(times) >= chunk:
+            yield block()
+
+        if m_min is not None and m < m_min:
+            stop = "fuel"
+            break
+        if stop_at_apoapsis and F == 0 and vy_prev > 0 >= vy:
+            stop = "apoapsis"
+            break
+        if h < 0 and t > dt:
+            stop = "crash"
+            break
+
+    yield block(stop)
+
+
+def simulate(stages, m0, **kwargs):
+    """
+    Моделирует подъём и возвращает словарь массивов STATE_KEYS.
+
+    Параметры и поля "stop"/"steps" - как у simulate_chunks; все блоки
+    склеиваются в один.
+    """
+    blocks = list(simulate_chunks(stages, m0, **kwargs))
+    result = {key: np.concatenate([b[key] for b in blocks]) for key in STATE_KEYS}
+    result["stop"] = blocks[-1]["stop"]
+    result["steps"] = blocks[-1]["steps"]
+    return result
+
+
+# ============================================================================
+# ПОТРЕБИТЕЛИ БЛОКОВ
+# ============================================================================
+# У каждого потребителя метод feed(block); run_stream раздаёт блоки из
+# simulate_chunks всем сразу, поэтому весь прогон в памяти не хранится.
+
+
+def run_stream(chunks, *consumers):
+    """Раздаёт блоки потребителям; возвращает последний блок (stop, steps)"""
+    last = None
+    for block in chunks:
+        for consumer in consumers:
+            consumer.feed(block)
+        last = block
+    return last
+
+
+class KeyPoints:
+    """Состояние в ближайших к заданным моментам точках"""
+
+    def __init__(self, times):
+        self.times = np.asarray(times, dtype=float)
+        self.distance = np.full(len(self.times), np.inf)
+        self.state = {key: np.full(len(self.times), np.nan) for key in STATE_KEYS}
+
+    def feed(self, block):
+        t = block["t"]
+        if len(t) == 0:
+            return
+        i = np.searchsorted(t, self.times).clip(1, len(t) - 1)
+        # Из двух соседних точек - ближайшая (при равенстве - более ранняя)
+        i -= np.abs(t[i - 1] - self.times) <= np.abs(t[i] - self.times)
+        distance = np.abs(t[i] - self.times)
+        better = distance < self.distance
+        self.distance[better] = distance[better]
+        for key in STATE_KEYS:
+            self.state[key][better] = block[key][i[better]]
+
+
+class Extremes:
+    """Максимальные скорость и высота и конечное состояние"""
+
+    def __init__(self):
+        self.v_max = 0.0
+        self.t_v_max = 0.0
+        self.h_max = 0.0
+        self.t_h_max = 0.0
+        self.final = None
+
+    def feed(self, block):
+        if len(block["t"]) == 0:
+            return
+        i = block["v"].argmax()
+        if block["v"][i] > self.v_max:
+            self.v_max = float(block["v"][i])
+            self.t_v_max = float(block["t"][i])
+        i = block["h"].argmax()
+        if block["h"][i] > self.h_max:
+            self.h_max = float(block["h"][i])
+            self.t_h_max = float(block["t"][i])
+        self.final = {key: float(block[key][-1]) for key in STATE_KEYS}
@@ -0,0 +1,146 @@
+"""
+Разметка времени итерации цикла полёта по фазам.
+
+RpcProfiler считает вызовы kRPC, но не показывает, куда уходит остальное
+время итерации. LoopSpans делит итерацию на фазы: в цикле после каждой
+фазы вызывается mark("фаза"), в конце итерации - tick(period). Длительности
+фаз и интервалы между итерациями пишутся в заранее выделенные массивы
+NumPy; в конце полёта summary() печатает разбивку по фазам и гистограмму
+дрожания (отклонения интервала между итерациями от заданного периода).
+
+Выключенный LoopSpans (enabled=False, или NO_SPANS) подменяет mark и
+tick пустой функцией - в цикле остаётся только её вызов.
+
+    spans = LoopSpans(FLIGHT_PHASES)
+    while ...:
+        ...чтение телеметрии...
+        spans.mark("telemetry")
+        ...
+        time.sleep(period)
+        spans.mark("sleep")
+        spans.tick(period)
+    spans.summary()
+"""
+
+import time
+
+import numpy as np
+
+# Фазы цикла подъёма
+FLIGHT_PHASES = ("telemetry", "guidance", "commands", "record", "print", "sleep")
+
+PHASE_NAMES = {
+    "telemetry": "Чтение телеметрии",
+    "guidance": "Расчёт управления",
+    "commands": "Отправка команд",
+    "record": "Запись данных",
+    "print": "Вывод на экран",
+    "sleep": "Ожидание",
+}
+
+# Границы корзин гистограммы дрожания, мс
+_JITTER_EDGES_MS = [0, 0.5, 1, 2, 5, 10, 20, 50, 100, 200]
+
+
+def _noop(*args):
+    pass
+
+
+class LoopSpans:
+    """Длительности фаз и дрожание итераций цикла в массивах NumPy"""
+
+    def __init__(self, phases=FLIGHT_PHASES, capacity=20000, enabled=True):
+        self.phases = tuple(phases)
+        self.enabled = enabled
+        self.count = 0  # записано итераций
+        self.overflow = 0  # итераций сверх ёмкости (не записаны)
+        if not enabled:
+            self.mark = self.tick = _noop
+            return
+
+        self.capacity = capacity
+        self._index = {name: i for i, name in enumerate(self.phases)}
+        # Лишняя строка - черновик для итераций сверх ёмкости
+        self.durations = np.zeros((capacity + 1, len(self.phases)))  # с
+        self.tick_times = np.zeros(capacity)  # конец итерации, perf_counter
+        self.periods = np.zeros(capacity)  # заданный период итерации, с
+        self._row = self.durations[0]
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Конец фазы phase: время с предыдущей отметки относится к ней"""
+        now = time.perf_counter()
+        self._row[self._index[phase]] += now - self._last
+        self._last = now
+
+    def tick(self, period=0.0):
+        """Конец итерации; period - на какой интервал рассчитан цикл"""
+        now = time.perf_counter()
+        if self.count < self.capacity:
+            self.tick_times[self.count] = now
+            self.periods[self.count] = period
+            self.count += 1
+        else:
+            self.overflow += 1
+        self._row = self.durations[self.count]
+        self._row[:] = 0.0
+        self._last = now
+
+    def jitter(self):
+        """Отклонение интервала между итерациями от заданного периода, с"""
+        n = self.count
+        if n < 2:
+            return np.zeros(0)
+        return np.diff(self.tick_times[:n]) - self.periods[1:n]
+
+    def summary(self):
+        """Печатает разбивку итерации по фазам и гистограмму дрожания"""
+        if not self.enabled or self.count == 0:
+            return
+        durations = self.durations[: self.count] * 1000  # мс
+        per_tick = durations.sum(axis=1)
+
+        print("\n" + "=" * 60)
+        print("ВРЕМЯ ИТЕРАЦИИ ЦИКЛА ПО ФАЗАМ:")
+        print("=" * 60)
+        line = f"- Итераций: {self.count}"
+        if self.overflow:
+            line += f" (ещё {self.overflow} сверх ёмкости не записаны)"
+        print(line)
+        print(
+            f"- Итерация: в среднем {per_tick.mean():.2f} мс, "
+            f"p99 {np.percentile(per_tick, 99):.2f} мс"
+        )
+        print(f"\n{'Фаза':20} {'Среднее':>9} {'p99':>8} {'Макс':>8} {'Доля':>6}")
+        total = durations.sum()
+        for i, phase in enumerate(self.phases):
+            column = durations[:, i]
+            share = column.sum() / total * 100 if total else 0.0
+            print(
+                f"{PHASE_NAMES.get(phase, phase):20} {column.mean():7.2f}мс "
+                f"{np.percentile(column, 99):6.2f}мс {column.max():6.2f}мс "
+                f"{share:5.1f}%"
+            )
+
+        jitter = np.abs(self.jitter()) * 1000
+        if len(jitter) == 0:
+            return
+        print(
+            f"\nДрожание интервала: p50 {np.percentile(jitter, 50):.2f} мс, "
+            f"p99 {np.percentile(jitter, 99):.2f} мс, макс {jitter.max():.2f} мс"
+        )
+        counts, _ = np.histogram(jitter, bins=_JITTER_EDGES_MS + [np.inf])
+        peak = counts.max()
+        for i, count in enumerate(counts):
+            if count:
+                lower = _JITTER_EDGES_MS[i]
+                if i + 1 < len(_JITTER_EDGES_MS):
+                    label = f"{lower}-{_JITTER_EDGES_MS[i + 1]} мс"
+                else:
+                    label = f">{lower} мс"
+                bar = "#" * max(1, round(40 * count / peak))
+                print(f"{label:>14} {count:7d} {bar}")
+
+
+# Выключенная разметка - значение по умолчанию для кода с необязательными spans
+NO_SPANS = LoopSpans(enabled=False)
@@ -0,0 +1,297 @@
+"""
+Суррогатная модель подъёма для мгновенных ответов "что если".
+
+Даже быстрый симулятор тратит миллисекунды на прогон, а вопросы обычно
+одни и те же: скорость на 150 с и на высоте 40 км при другом Cd или
+другой высоте конца разворота. Построение:
+
+1. точки в прямоугольнике параметров PARAMETERS (последовательность
+   Холтона - равномерное покрытие без сгустков);
+2. прогоны ksp_sim.simulate в пуле процессов;
+3. интерполяция радиальными базисными функциями (thin-plate spline с
+   линейной частью) на нормированных к [0, 1] параметрах;
+4. оценка ошибки на отдельных случайных проверочных прогонах, не
+   участвовавших в подгонке (максимум модуля ошибки по каждому выходу).
+
+Модель сохраняется в ksp_surrogate.npz и отвечает на векторные запросы
+без повторного моделирования:
+
+    python ksp_surrogate.py build --samples 200
+    python ksp_surrogate.py query cd=0.3 turn_end=30000
+
+    model = Surrogate.load()
+    model.predict(cd=[0.2, 0.3], turn_end=30000)["v_150"]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ksp_pitch import TURN_START, PitchProgram
+from ksp_sim import A, M0, rocket_stages, simulate
+
+SURROGATE_FILE = "ksp_surrogate.npz"
+
+# Параметры и их диапазоны
+PARAMETERS = {
+    "cd": (0.15, 0.45),  # дозвуковой коэффициент сопротивления
+    "turn_end": (15000.0, 40000.0),  # высота конца разворота, м
+}
+
+# Ракета - из ksp_sim (M0, A, rocket_stages), начало разворота - из
+# ksp_pitch, как в скриптах-теориях; меняется только конец разворота
+T_MAX = 250.0  # с, с запасом до 40 км
+ATMOSPHERE = "table"
+
+# Выходы модели
+OUTPUTS = ("v_150", "h_150", "h_max", "v_40km")
+OUTPUT_NAMES = {
+    "v_150": "Скорость на 150 с, м/с",
+    "h_150": "Высота на 150 с, м",
+    "h_max": f"Наибольшая высота за {T_MAX:.0f} с, м",
+    "v_40km": "Скорость на 40 км, м/с",
+}
+
+
+def run_case(params):
+    """Один прогон модели; выходы в порядке OUTPUTS (nan - не достигнуто)"""
+    sim = simulate(
+        rocket_stages(),
+        M0,
+        t_max=T_MAX,
+        pitch=PitchProgram.turn(TURN_START, params["turn_end"]),
+        cd=params["cd"],
+        area=A,
+        atmosphere=ATMOSPHERE,
+    )
+    t, v, h = sim["t"], sim["v"], sim["h"]
+    v_150 = np.interp(150.0, t, v)
+    h_150 = np.interp(150.0, t, h)
+    h_max = h.max()
+
+    # Первое пересечение 40 км - линейно между соседними шагами
+    above = np.flatnonzero(h >= 40000.0)
+    v_40km = np.nan
+    if len(above) and above[0] > 0:
+        i = above[0]
+        f = (40000.0 - h[i - 1]) / (h[i] - h[i - 1])
+        v_40km = v[i - 1] + (v[i] - v[i - 1]) * f
+    return [v_150, h_150, h_max, v_40km]
+
+
+def _run_cases(points, names, workers):
+    cases = [dict(zip(names, p)) for p in points.tolist()]
+    if workers == 1:
+        return np.array([run_case(c) for c in cases])
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        chunk = max(1, len(cases) // (4 * (workers or os.cpu_count() or 1)))
+        return np.array(list(pool.map(run_case, cases, chunksize=chunk)))
+
+
+def halton(n, dims):
+    """Первые n точек последовательности Холтона в [0, 1]^dims"""
+    primes = [2, 3, 5, 7, 11, 13][:dims]
+    points = np.zeros((n, dims))
+    for d, base in enumerate(primes):
+        for i in range(n):
+            f, k, x = 1.0, i + 1, 0.0
+            while k:
+                f /= base
+                x += f * (k % base)
+                k //= base
+            points[i, d] = x
+    return points
+
+
+def _kernel(r):
+    """Thin-plate spline r² ln r"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(r > 0, r * r * np.log(r), 0.0)
+
+
+def _fit_rbf(x, values):
+    """Веса RBF с линейной частью для нормированных точек x"""
+    n, d = x.shape
+    r = np.linalg.norm(x[:, None, :] - x[None, :, :], axis=2)
+    poly = np.hstack([np.ones((n, 1)), x])
+    system = np.zeros((n + d + 1, n + d + 1))
+    system[:n, :n] = _kernel(r)
+    system[:n, n:] = poly
+    system[n:, :n] = poly.T
+    return np.linalg.solve(system, np.concatenate([values, np.zeros(d + 1)]))
+
+
+def _eval_rbf(x, centers, weights):
+    r = np.linalg.norm(x[:, None, :] - centers[None, :, :], axis=2)
+    n = len(centers)
+    return _kernel(r) @ weights[:n] + weights[n] + x @ weights[n + 1 :]
+
+
+class Surrogate:
+    """
+    Интерполяция RBF по прогонам симулятора.
+
+    Каждый выход подгоняется по своим точкам: v_40km определена только там,
+    где ракета долетает до 40 км, и predict возвращает для неё nan, если
+    модель h_max даёт меньше 40 км.
+    """
+
+    def __init__(self, names, lo, hi, fits, errors):
+        self.names = list(names)
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        self.fits = fits  # выход -> (нормированные центры, веса)
+        self.outputs = list(fits)
+        self.errors = dict(errors)  # оценка ошибки по выходам
+
+    @classmethod
+    def fit(cls, names, lo, hi, points, values):
+        """Подгонка по точкам points (в единицах параметров) и значениям"""
+        lo = np.asarray(lo, dtype=float)
+        hi = np.asarray(hi, dtype=float)
+        x = (points - lo) / (hi - lo)
+        fits = {}
+        for i, name in enumerate(OUTPUTS):
+            ok = ~np.isnan(values[:, i])
+            fits[name] = (x[ok], _fit_rbf(x[ok], values[ok, i]))
+        return cls(names, lo, hi, fits, {name: np.nan for name in OUTPUTS})
+
+    def evaluate(self, points):
+        """Выходы для массива точек (m x число параметров): m x число выходов"""
+        x = (np.atleast_2d(points) - self.lo) / (self.hi - self.lo)
+        values = np.column_stack(
+            [_eval_rbf(x, *self.fits[name]) for name in self.outputs]
+        )
+        if "v_40km" in self.outputs and "h_max" in self.outputs:
+            unreached = values[:, self.outputs.index("h_max")] < 40000.0
+            values[unreached, self.outputs.index("v_40km")] = np.nan
+        return values
+
+    def predict(self, **params):
+        """Векторный запрос: predict(cd=[...], turn_end=...) -> {выход: массив}"""
+        columns = np.broadcast_arrays(
+            *[np.asarray(params[key], dtype=float) for key in self.names]
+        )
+        shape = columns[0].shape
+        points = np.stack([c.ravel() for c in columns], axis=1)
+        values = self.evaluate(points)
+        return {
+            name: values[:, i].reshape(shape) for i, name in enumerate(self.outputs)
+        }
+
+    def save(self, filename=SURROGATE_FILE):
+        arrays = {}
+        for name, (centers, weights) in self.fits.items():
+            arrays[f"centers_{name}"] = centers
+            arrays[f"weights_{name}"] = weights
+        np.savez(
+            filename,
+            names=np.array(self.names),
+            lo=self.lo,
+            hi=self.hi,
+            outputs=np.array(self.outputs),
+            errors=np.array([self.errors[name] for name in self.outputs]),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, filename=SURROGATE_FILE):
+        with np.load(filename) as data:
+            outputs = data["outputs"].tolist()
+            fits = {
+                name: (data[f"centers_{name}"], data[f"weights_{name}"])
+                for name in outputs
+            }
+            errors = dict(zip(outputs, data["errors"].tolist()))
+            return cls(data["names"].tolist(), data["lo"], data["hi"], fits, errors)
+
+
+def build(samples=200, validation=40, workers=None, seed=0):
+    """Прогоны, подгонка, оценка ошибки; возвращает Surrogate"""
+    names = list(PARAMETERS)
+    lo = np.array([PARAMETERS[k][0] for k in names])
+    hi = np.array([PARAMETERS[k][1] for k in names])
+
+    train = lo + halton(samples, len(names)) * (hi - lo)
+    rng = np.random.default_rng(seed)
+    check = lo + rng.random((validation, len(names))) * (hi - lo)
+
+    start = time.perf_counter()
+    values = _run_cases(np.vstack([train, check]), names, workers)
+    elapsed = time.perf_counter() - start
+    print(f"Прогонов: {len(values)} за {elapsed:.1f} с")
+
+    train_values, check_values = values[:samples], values[samples:]
+    model = Surrogate.fit(names, lo, hi, train, train_values)
+
+    # Ошибка - на проверочных прогонах, не участвовавших в подгонке
+    # (там, где выход определён и моделью, и прогоном)
+    errors = np.abs(model.evaluate(check) - check_values)
+    for i, name in enumerate(OUTPUTS):
+        column = errors[:, i]
+        if np.isnan(column).all():
+            model.errors[name] = np.nan
+        else:
+            model.errors[name] = float(np.nanmax(column))
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Суррогатная модель подъёма")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="прогоны и подгонка")
+    p_build.add_argument("--samples", type=int, default=200)
+    p_build.add_argument("--validation", type=int, default=40)
+    p_build.add_argument("--workers", type=int, default=None)
+    p_build.add_argument("--out", default=SURROGATE_FILE)
+    p_query = sub.add_parser("query", help="запрос к сохранённой модели")
+    p_query.add_argument("params", nargs="+", help="имя=значение, например cd=0.3")
+    p_query.add_argument("--model", default=SURROGATE_FILE)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        model = build(args.samples, args.validation, args.workers)
+        model.save(args.out)
+        print(f"✓ Модель сохранена: {args.out}")
+        print("\nОценка ошибки (максимум на проверочных прогонах):")
+        for name in model.outputs:
+            print(f"- {OUTPUT_NAMES[name]}: ±{model.errors[name]:.2f}")
+
+        center = {k: (lo + hi) / 2 for k, (lo, hi) in PARAMETERS.items()}
+        start = time.perf_counter()
+        for _ in range(1000):
+            model.predict(**center)
+        single = (time.perf_counter() - start) / 1000 * 1e6
+        grid = {k: np.linspace(lo, hi, 10000) for k, (lo, hi) in PARAMETERS.items()}
+        start = time.perf_counter()
+        model.predict(**grid)
+        batch = (time.perf_counter() - start) / 10000 * 1e6
+        print(
+            f"\nЗапрос: {single:.0f} мкс, "
+            f"в пакете из 10000 - {batch:.1f} мкс на точку"
+        )
+        return
+
+    model = Surrogate.load(args.model)
+    params = {}
+    for item in args.params:
+        key, value = item.split("=")
+        params[key] = float(value)
+    # Не заданные параметры - середина диапазона
+    for key, lo, hi in zip(model.names, model.lo, model.hi):
+        params.setdefault(key, (lo + hi) / 2)
+    result = model.predict(**params)
+    print(", ".join(f"{key}={params[key]:g}" for key in model.names))
+    for name in model.outputs:
+        value = float(result[name])
+        text = "не достигается" if np.isnan(value) else f"{value:.1f}"
+        print(f"- {OUTPUT_NAMES[name]}: {text} ± {model.errors[name]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
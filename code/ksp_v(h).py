@@ -1,95 +1,50 @@
-import krpc
-import time
 import numpy as np
 import matplotlib.pyplot as plt
 import os
 from datetime import datetime
 
-print(" ПОДКЛЮЧЕНИЕ К KSP...")
-conn = krpc.connect(name="KSP_Telemetry")
-vessel = conn.space_center.active_vessel
+from ksp_ascent import FLIGHT_ARRAYS, AscentProgram, fly_ascent
+from ksp_bus import TelemetryBus
+from ksp_control import CommandOutput
+from ksp_link import FlightLink
+from ksp_plot import save_flight, style_speed_height
+from ksp_rpc_profile import RpcProfiler
+from ksp_sampling import AdaptiveSampler
+from ksp_spans import LoopSpans
 
-# Параметры
-TARGET_ALTITUDE = 40000
-MAX_TIME = 140
-TURN_START = 800
-TURN_END = 25000
+print(" ПОДКЛЮЧЕНИЕ К KSP...")
+link = FlightLink(name="KSP_Telemetry")
+profiler = RpcProfiler(link.control_conn)
+vessel = link.vessel  # команды
+commands = CommandOutput(vessel)  # команды без повторов
 
-# Массивы данных
-times = []
-altitudes = []
-speeds = []
-thrusts = []
+# Параметры: подъём до 40 км по программе тангажа по умолчанию - той же,
+# что в модели и в автопилоте взлёта (ksp_pitch.DEFAULT_PITCH)
+program = AscentProgram(target_altitude=40000, max_time=140)
 
 print("1. ЗАПУСК ДВИГАТЕЛЕЙ...")
-vessel.control.gear = False
-vessel.auto_pilot.engage()
-vessel.auto_pilot.target_pitch_and_heading(90, 90)
-vessel.control.throttle = 1.0
-vessel.control.activate_next_stage()
-
-start_time = time.time()
-print_time = start_time
+# Шина телеметрии для внешних читателей (python ksp_bus.py)
+bus = TelemetryBus()
+sampler = AdaptiveSampler(base_period=0.05)
+# Разметка итераций цикла по фазам (enabled=False - выключить)
+spans = LoopSpans(enabled=True)
 
 print("2. СБОР ТЕЛЕМЕТРИИ...")
-print("Время(с)  Высота(м)  Скорость(м/с)")
-print("-" * 40)
-
 try:
-    while vessel.flight().mean_altitude < TARGET_ALTITUDE:
-        current_time = time.time() - start_time
-
-        # Логирование каждые 5 секунд
-        if time.time() - print_time > 5:
-            speed_orbit = vessel.orbit.speed
-            print(
-                f"{current_time:6.1f}с  {vessel.flight().mean_altitude:8.0f}м  {speed_orbit:10.1f}м/с"
-            )
-            print_time = time.time()
-
-        if current_time > MAX_TIME:
-            print(f"Достигнуто {MAX_TIME} секунд")
-            break
-
-        # Автопилот
-        altitude = vessel.flight().mean_altitude
-        h_speed = vessel.flight().horizontal_speed
-
-        if TURN_START < altitude < TURN_END:
-            turn_angle = ((altitude - TURN_START) / (TURN_END - TURN_START)) * 80
-            vessel.auto_pilot.target_pitch_and_heading(90 - turn_angle, 90)
-
-        if altitude > 30000 and h_speed > 800:
-            vessel.auto_pilot.target_pitch_and_heading(5, 90)
-
-        times.append(current_time)
-        altitudes.append(altitude)
-        speeds.append(vessel.orbit.speed)
-        thrusts.append(vessel.thrust)
+    flight = fly_ascent(
+        link, program, commands, sampler, bus=bus, profiler=profiler, spans=spans
+    )
+finally:
+    bus.close()
+    link.telemetry.remove()
 
-        # Отделение ступеней
-        if vessel.thrust == 0 and vessel.control.current_stage > 1:
-            print(f"Отделение ступени на {current_time:.1f}с")
-            vessel.control.activate_next_stage()
-            time.sleep(1)
-
-        time.sleep(0.05)
-
-except Exception as e:
-    print(f"Ошибка: {e}")
-    import traceback
-
-    traceback.print_exc()
+times = flight["times"]
+altitudes = flight["altitudes"]
+speeds = flight["speeds"]
 
 print(f"\n3. ПОЛЕТ ЗАВЕРШЕН. Собрано {len(times)} точек")
 vessel.auto_pilot.disengage()
 
-# Конвертируем в numpy массивы
-times = np.array(times)
-altitudes = np.array(altitudes)
-speeds = np.array(speeds)
-thrusts = np.array(thrusts)
-
 # Проверяем данные
 if len(times) == 0:
     print("ОШИБКА: Нет данных!")
@@ -101,6 +56,7 @@ print(f"- Время полета: {times[-1]:.1f} с")
 print(f"- Высота: от {altitudes[0]:.0f} до {altitudes[-1]:.0f} м")
 print(f"- Скорость: от {speeds[0]:.1f} до {speeds[-1]:.1f} м/с")
 print(f"- Максимальная скорость: {np.max(speeds):.1f} м/с")
+spans.summary()
 
 # ============================================================================
 # ГРАФИК: v(h) - СКОРОСТЬ ОТ ВЫСОТЫ (ЕДИНСТВЕННЫЙ)
@@ -114,29 +70,11 @@ os.makedirs("ksp_graphs", exist_ok=True)
 # Основной график - скорость от высоты
 plt.plot(speeds, altitudes / 1000, "b-", linewidth=3)
 
-# Настройка осей и сетки
-plt.xlabel("Скорость, м/с", fontsize=14)
-plt.ylabel("Высота, км", fontsize=14)
-plt.title(
-    "Зависимость скорости от высоты\n(Экспериментальные данные KSP)",
-    fontsize=16,
-    fontweight="bold",
+# Оси, сетка и подписи - общий шаблон
+style_speed_height(
+    plt.gca(), "Зависимость скорости от высоты\n(Экспериментальные данные KSP)"
 )
 
-plt.xlim(0, 1200)
-plt.ylim(0, 70)
-
-plt.xticks([0, 200, 400, 600, 800, 1000, 1200])
-plt.yticks([0, 10, 20, 30, 40, 50, 60, 70])
-plt.grid(True, linestyle="--", alpha=0.7)
-
-for x in [200, 400, 600, 800, 1000]:
-    plt.axvline(x=x, color="gray", linestyle=":", alpha=0.5)
-
-# Горизонтальные линии
-for y in [10, 20, 30, 40, 50, 60]:
-    plt.axhline(y=y, color="gray", linestyle=":", alpha=0.5)
-
 # Добавляем информацию о максимальной скорости
 max_speed = np.max(speeds)
 max_speed_idx = np.argmax(speeds)
@@ -168,6 +106,14 @@ filename = f"ksp_graphs/speed_vs_height_{timestamp}.png"
 plt.savefig(filename, dpi=300, bbox_inches="tight")
 print(f"\n✓ ГРАФИК СОХРАНЕН: {filename}")
 
+# Телеметрия в архив для пакетной перерисовки (ksp_plot.py)
+flight_file = save_flight(
+    name=f"flight_{timestamp}",
+    separations=flight["separations"],
+    **{key: flight[key] for key in FLIGHT_ARRAYS},
+)
+print(f"✓ ТЕЛЕМЕТРИЯ СОХРАНЕНА: {flight_file}")
+
 # ============================================================================
 # ВЫВОД РЕЗУЛЬТАТОВ ДЛЯ СРАВНЕНИЯ
 # ============================================================================
@@ -193,5 +139,9 @@ print("Готово! График зависимости скорости от 
 print("Теперь можно сравнить с теоретическим графиком.")
 print("=" * 60)
 
+# Профиль вызовов kRPC за полёт
+profiler.summary()
+commands.summary()
+
 # Показываем график
 plt.show()
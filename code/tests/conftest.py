@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули лежат плоско в code/ рядом со скриптами
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
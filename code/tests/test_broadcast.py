@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+from ksp_broadcast import (
+    FIELDS,
+    FrameDecoder,
+    FrameEncoder,
+    _get_varint,
+    _put_varint,
+    read_frame,
+)
+
+
+def _records():
+    """Подъём и отделение: высота растёт, тяга и ступень падают скачком"""
+    records = []
+    for i in range(30):
+        t = i * 0.1
+        thrust = 6.06e6 if i < 15 else 0.0 if i < 18 else 1.44e6
+        stage = 3 if i < 15 else 2
+        records.append([t, 100.0 + 35.5 * i, 50.0 - 1.25 * i, 3.3, thrust, stage, 10])
+    return records
+
+
+@pytest.mark.parametrize(
+    "value", [0, 1, -1, 63, -64, 64, -65, 300, -300, 2**31, -(2**31), 2**62]
+)
+def test_varint_round_trip(value):
+    out = bytearray()
+    _put_varint(out, value)
+    assert _get_varint(bytes(out), 0) == (value, len(out))
+
+
+def test_small_values_take_one_byte():
+    for value in (-64, -1, 0, 1, 63):
+        out = bytearray()
+        _put_varint(out, value)
+        assert len(out) == 1
+
+
+def test_frames_round_trip_with_negative_deltas():
+    encoder = FrameEncoder(keyframe_interval=10)
+    decoder = FrameDecoder()
+    keys = []
+    for values in _records():
+        frame, key = encoder.encode(values)
+        keys.append(key)
+        decoded = decoder.decode(read_frame(io.BytesIO(frame)))
+        for (name, scale), value in zip(FIELDS, values):
+            assert decoded[name] == pytest.approx(value, abs=0.5 / scale)
+
+    assert [i for i, key in enumerate(keys) if key] == [0, 10, 20]
+
+
+def test_decoder_starts_at_keyframe():
+    encoder = FrameEncoder(keyframe_interval=10)
+    frames = [encoder.encode(values)[0] for values in _records()]
+    stream = io.BytesIO(b"".join(frames[3:]))
+
+    # Зритель подключился посреди цепочки разностей: до опорного кадра
+    # значений нет
+    decoder = FrameDecoder()
+    decoded = []
+    while (payload := read_frame(stream)) is not None:
+        decoded.append(decoder.decode(payload))
+    assert decoded[:7] == [None] * 7
+    assert decoded[7]["t"] == pytest.approx(1.0)
+    assert decoded[-1]["stage"] == 2
+    assert read_frame(stream) is None
+
+
+def test_force_keyframe():
+    encoder = FrameEncoder(keyframe_interval=100)
+    records = _records()
+    encoder.encode(records[0])
+    assert not encoder.encode(records[1])[1]
+    encoder.force_keyframe()
+    frame, key = encoder.encode(records[2])
+    assert key
+
+    decoded = FrameDecoder().decode(read_frame(io.BytesIO(frame)))
+    assert decoded["altitude"] == pytest.approx(records[2][1], abs=0.05)
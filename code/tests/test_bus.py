@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from ksp_bus import BusOverrun, TelemetryBus, TelemetryReader
+
+CAPACITY = 8
+
+
+@pytest.fixture
+def bus():
+    bus = TelemetryBus(f"ksp_test_{os.getpid()}", capacity=CAPACITY)
+    yield bus
+    bus.close()
+
+
+def _publish(bus, start, count):
+    for i in range(start, start + count):
+        bus.publish(float(i), 100.0 * i, 10.0, 5.0, 1000.0, 3, 10.0)
+
+
+def test_read_round_trip(bus):
+    reader = TelemetryReader(bus.name)
+    try:
+        assert not reader.wait(timeout=0.01)
+        _publish(bus, 0, 5)
+        assert reader.wait(timeout=1.0)
+        records = reader.read()
+        np.testing.assert_array_equal(records["t"], [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(records["altitude"], [0, 100, 200, 300, 400])
+        np.testing.assert_array_equal(records["seq"], [2, 4, 6, 8, 10])
+        assert len(reader.read()) == 0
+        assert reader.lost == 0
+    finally:
+        reader.close()
+
+
+def test_reader_starts_at_current_record(bus):
+    _publish(bus, 0, 3)
+    late = TelemetryReader(bus.name)
+    early = TelemetryReader(bus.name, from_start=True)
+    try:
+        assert len(late.read()) == 0
+        np.testing.assert_array_equal(early.read()["t"], [0, 1, 2])
+    finally:
+        late.close()
+        early.close()
+
+
+def test_poll_stops_at_buffer_end(bus):
+    reader = TelemetryReader(bus.name)
+    try:
+        _publish(bus, 0, 6)
+        assert len(reader.read()) == 6
+        _publish(bus, 6, 6)
+        # Блок без копирования не переходит через конец кольца
+        block = reader.poll()
+        assert block["t"].tolist() == [6, 7]
+        del block
+        reader.release()
+        np.testing.assert_array_equal(reader.read()["t"], [8, 9, 10, 11])
+    finally:
+        reader.close()
+
+
+def test_lapped_reader_skips_to_oldest(bus):
+    reader = TelemetryReader(bus.name)
+    try:
+        _publish(bus, 0, 20)
+        records = np.concatenate([reader.read(), reader.read()])
+        # Уцелели только последние CAPACITY записей
+        np.testing.assert_array_equal(records["t"], np.arange(12, 20))
+        assert reader.lost == 12
+    finally:
+        reader.close()
+
+
+def test_overwrite_during_read(bus):
+    reader = TelemetryReader(bus.name)
+    try:
+        _publish(bus, 0, 4)
+        block = reader.poll()
+        assert len(block) == 4
+        # Писатель проходит кольцо целиком, пока блок обрабатывается
+        _publish(bus, 4, CAPACITY)
+        del block
+        with pytest.raises(BusOverrun):
+            reader.release()
+        # Дальше чтение продолжается с самых старых уцелевших записей
+        np.testing.assert_array_equal(reader.read()["t"], [4, 5, 6, 7])
+        np.testing.assert_array_equal(reader.read()["t"], [8, 9, 10, 11])
+    finally:
+        reader.close()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import ksp_campaign
+from ksp_ascent import FLIGHT_ARRAYS, AscentProgram
+from ksp_campaign import Campaign
+
+
+def _flight(n, stop, error=""):
+    """Телеметрия из n отсчётов с остановкой stop"""
+    flight = {key: np.arange(n, dtype=float) for key in FLIGHT_ARRAYS}
+    flight.update(separations=np.zeros((0, 2)), stop=stop, error=error)
+    return flight
+
+
+class FakeCampaign(Campaign):
+    """Кампания без KSP: попытки берутся из списка outcomes"""
+
+    def __init__(self, outcomes, retries):
+        self.name = "test"
+        self.retries = retries
+        self.results = []
+        self.outcomes = list(outcomes)
+        self.reconnects = 0
+
+    def restore(self):
+        if self.outcomes[0] == "restore":
+            self.outcomes.pop(0)
+            raise TimeoutError("корабль не появился на стартовом столе")
+
+    def reconnect(self):
+        self.reconnects += 1
+
+    def _fly(self, program):
+        return self.outcomes.pop(0)
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    names = []
+
+    def save_flight(name, **data):
+        names.append(name)
+        return f"{name}.npz"
+
+    monkeypatch.setattr(ksp_campaign, "save_flight", save_flight)
+    return names
+
+
+def test_every_failed_attempt_recorded(saved):
+    campaign = FakeCampaign(
+        [
+            (_flight(50, "error", "связь потеряна"), "crash", "связь потеряна"),
+            "restore",
+            (_flight(20, "error", "таймаут"), "error", "таймаут"),
+        ],
+        retries=2,
+    )
+    record = campaign.run_one(1, AscentProgram(name="p"))
+
+    attempts = record["attempts"]
+    assert [a["result"] for a in attempts] == ["crash", "error", "error"]
+    assert attempts[0]["file"] == "test_001_p.npz"
+    assert attempts[0]["max_altitude"] == 49.0
+    assert attempts[0]["error"] == "связь потеряна"
+    assert "file" not in attempts[1]
+    assert attempts[1]["error"].startswith("подготовка")
+    assert attempts[2]["file"] == "test_001_p_try3.npz"
+    assert saved == ["test_001_p", "test_001_p_try3"]
+    # Итог - последняя попытка
+    assert record["result"] == "error"
+    assert record["file"] == "test_001_p_try3.npz"
+    assert campaign.reconnects == 2
+
+
+def test_retry_stops_after_success(saved):
+    campaign = FakeCampaign(
+        [
+            (None, "timeout", "connection closed"),
+            (_flight(30, "altitude"), "ok", ""),
+            (_flight(30, "altitude"), "ok", ""),
+        ],
+        retries=3,
+    )
+    record = campaign.run_one(2, AscentProgram(name="p"))
+
+    assert [a["result"] for a in record["attempts"]] == ["timeout", "ok"]
+    assert record["attempts"][0] == {
+        "result": "timeout",
+        "wall_time": record["attempts"][0]["wall_time"],
+        "error": "connection closed",
+    }
+    assert record["result"] == "ok"
+    assert record["file"] == "test_002_p_try2.npz"
+    assert campaign.results == [record]
@@ -0,0 +1,114 @@
+import pytest
+
+from ksp_control import CommandOutput
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class FakeAutoPilot:
+    def __init__(self):
+        self.targets = []
+
+    def target_pitch_and_heading(self, pitch, heading):
+        self.targets.append((pitch, heading))
+
+
+class FakeControl:
+    def __init__(self):
+        self.throttles = []
+        self.stagings = 0
+
+    @property
+    def throttle(self):
+        return self.throttles[-1]
+
+    @throttle.setter
+    def throttle(self, value):
+        self.throttles.append(value)
+
+    def activate_next_stage(self):
+        self.stagings += 1
+
+
+class FakeVessel:
+    def __init__(self):
+        self.auto_pilot = FakeAutoPilot()
+        self.control = FakeControl()
+
+
+@pytest.fixture
+def setup():
+    clock = FakeClock()
+    vessel = FakeVessel()
+    return CommandOutput(vessel, refresh=2.0, clock=clock), vessel, clock
+
+
+def test_attitude_suppressed_inside_deadband(setup):
+    commands, vessel, clock = setup
+    assert commands.target_pitch_and_heading(45.0, 90.0)
+    clock.t = 0.5
+    assert not commands.target_pitch_and_heading(45.2, 90.0)
+    assert not commands.target_pitch_and_heading(45.0, 90.25)
+    clock.t = 1.0
+    assert commands.target_pitch_and_heading(45.3, 90.0)
+    assert vessel.auto_pilot.targets == [(45.0, 90.0), (45.3, 90.0)]
+    assert commands.sent["attitude"] == 2
+    assert commands.suppressed["attitude"] == 2
+
+
+def test_attitude_resent_after_refresh(setup):
+    commands, vessel, clock = setup
+    commands.target_pitch_and_heading(5.0, 90.0)
+    clock.t = 1.9
+    assert not commands.target_pitch_and_heading(5.0, 90.0)
+    clock.t = 2.0
+    assert commands.target_pitch_and_heading(5.0, 90.0)
+    # Интервал обновления отсчитывается от последней отправки
+    clock.t = 3.0
+    assert not commands.target_pitch_and_heading(5.0, 90.0)
+    assert len(vessel.auto_pilot.targets) == 2
+
+
+def test_throttle_deadband_and_exact_limits(setup):
+    commands, vessel, clock = setup
+    assert commands.set_throttle(0.5)
+    assert not commands.set_throttle(0.505)
+    assert commands.set_throttle(0.52)
+    # 0 и 1 всегда отправляются точно, даже внутри зоны нечувствительности
+    assert commands.set_throttle(0.995)
+    assert commands.set_throttle(1.0)
+    assert not commands.set_throttle(1.0)
+    commands.set_throttle(0.005)
+    assert commands.set_throttle(0.0)
+    clock.t = 2.5
+    assert commands.set_throttle(0.0)
+    assert vessel.control.throttles == [0.5, 0.52, 0.995, 1.0, 0.005, 0.0, 0.0]
+    assert commands.suppressed["throttle"] == 2
+
+
+def test_stage_sent_once_per_stage(setup):
+    commands, vessel, clock = setup
+    assert commands.activate_next_stage(3)
+    assert not commands.activate_next_stage(3)
+    clock.t = 10.0
+    # Повтор остаётся подавленным и после интервала обновления
+    assert not commands.activate_next_stage(3)
+    assert commands.activate_next_stage(2)
+    assert vessel.control.stagings == 2
+    assert commands.sent["stage"] == 2
+    assert commands.suppressed["stage"] == 2
+
+
+def test_stage_force_repeats(setup):
+    commands, vessel, clock = setup
+    commands.activate_next_stage(3)
+    assert commands.activate_next_stage(3, force=True)
+    assert commands.staged_from == 3
+    assert vessel.control.stagings == 2
+    assert commands.suppressed["stage"] == 0
@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+from ksp_sim import ATMOSPHERE_HEIGHT, MU, R, kepler_events, kepler_propagate
+
+
+def _rk4(r0, vr0, vt0, duration, dt=0.05):
+    """Задача двух тел в декартовых координатах методом Рунге-Кутты"""
+
+    def deriv(s):
+        x, y, vx, vy = s
+        k = -MU / math.hypot(x, y) ** 3
+        return (vx, vy, k * x, k * y)
+
+    state = (r0, 0.0, vr0, vt0)
+    n = round(duration / dt)
+    for _ in range(n):
+        k1 = deriv(state)
+        k2 = deriv([s + dt / 2 * k for s, k in zip(state, k1)])
+        k3 = deriv([s + dt / 2 * k for s, k in zip(state, k2)])
+        k4 = deriv([s + dt * k for s, k in zip(state, k3)])
+        state = [
+            s + dt / 6 * (a + 2 * b + 2 * c + d)
+            for s, a, b, c, d in zip(state, k1, k2, k3, k4)
+        ]
+    x, y, vx, vy = state
+    r = math.hypot(x, y)
+    return r, (x * vx + y * vy) / r, (x * vy - y * vx) / r
+
+
+# Суборбитальный выход из атмосферы, почти круговая орбита, гипербола
+STATES = [
+    (R + 75000.0, 500.0, 1800.0),
+    (R + 80000.0, -20.0, 2280.0),
+    (R + 100000.0, 300.0, 4000.0),
+]
+
+
+@pytest.mark.parametrize("state", STATES)
+@pytest.mark.parametrize("dt", [1.0, 120.0, 600.0])
+def test_propagate_matches_rk4(state, dt):
+    expected = _rk4(*state, dt)
+    r, vr, vt = kepler_propagate(*state, dt)
+    assert r == pytest.approx(expected[0], abs=0.01)
+    assert vr == pytest.approx(expected[1], abs=1e-4)
+    assert vt == pytest.approx(expected[2], abs=1e-4)
+
+
+def test_propagate_zero_time():
+    assert kepler_propagate(*STATES[0], 0) == STATES[0]
+
+
+def test_events_hit_apoapsis_and_entry():
+    state = STATES[0]
+    t_apo, t_entry = kepler_events(*state)
+    assert 0 < t_apo < t_entry < math.inf
+
+    # В апоцентре радиальная скорость обнуляется, радиус наибольший
+    r, vr, _ = kepler_propagate(*state, t_apo)
+    assert vr == pytest.approx(0.0, abs=1e-6)
+    assert r > kepler_propagate(*state, t_apo - 1.0)[0]
+    assert r > kepler_propagate(*state, t_apo + 1.0)[0]
+
+    # Вход в атмосферу - на нисходящей ветви на 70 км
+    r, vr, _ = kepler_propagate(*state, t_entry)
+    assert r - R == pytest.approx(ATMOSPHERE_HEIGHT, abs=0.01)
+    assert vr < 0
+
+
+def test_events_without_entry_or_bound_orbit():
+    # Перицентр выше атмосферы: апоцентр есть, входа нет
+    t_apo, t_entry = kepler_events(R + 100000.0, 50.0, 2250.0)
+    assert t_apo < math.inf
+    assert t_entry == math.inf
+    # Гипербола: событий нет
+    assert kepler_events(*STATES[2]) == (math.inf, math.inf)
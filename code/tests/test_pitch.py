@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from ksp_ascent import AscentProgram
+from ksp_pitch import DEFAULT_PITCH, PitchProgram
+from ksp_sim import get_pitch
+
+PROGRAMS = [
+    PitchProgram.turn(800, 25000, 80, final_altitude=30000),
+    PitchProgram([(25000, 10), (800, 90), (12000, 45)], final_altitude=None),
+    PitchProgram([(1000, 85), (1004, 60)], step=3.0),  # узлы вне сетки
+]
+
+
+def _points():
+    heights = np.concatenate(
+        [np.linspace(-100, 45000, 2001), [0, 800, 805, 24999.5, 25000, 30000.1]]
+    )
+    h_speeds = np.resize([0.0, 500.0, 799.0, 801.0, 2000.0], len(heights))
+    return heights, h_speeds
+
+
+def _scalar(program, heights, h_speeds):
+    return [program(h, vx) for h, vx in zip(heights, h_speeds)]
+
+
+@pytest.mark.parametrize("program", PROGRAMS)
+def test_table_matches_knots(program):
+    # Между узлами, попавшими на сетку, - линейная интерполяция узлов
+    heights, h_speeds = _points()
+    h_speeds = np.zeros_like(h_speeds)
+    knots = np.array(program.knots)
+    expected = np.interp(heights, knots[:, 0], knots[:, 1])
+    on_grid = np.all(knots[:, 0] % program.step == 0)
+    tolerance = 1e-9 if on_grid else abs(np.diff(knots[:, 1])).max()
+    assert _scalar(program, heights, h_speeds) == pytest.approx(expected, abs=tolerance)
+
+
+def test_default_program_is_shared():
+    assert get_pitch is DEFAULT_PITCH
+    ascent = AscentProgram()
+    heights, h_speeds = _points()
+    assert _scalar(ascent.pitch, heights, h_speeds) == _scalar(
+        DEFAULT_PITCH, heights, h_speeds
+    )
+
+
+def test_turn_program():
+    program = PROGRAMS[0]
+    assert program(0, 0) == 90
+    assert program(800, 0) == 90
+    assert program(12900, 0) == pytest.approx(50.0)
+    assert program(25000, 0) == pytest.approx(10.0)
+    assert program(50000, 0) == pytest.approx(10.0)
+    # Пологий участок - только выше final_altitude и при большой vx
+    assert program(29000, 2000) == pytest.approx(10.0)
+    assert program(31000, 700) == pytest.approx(10.0)
+    assert program(31000, 900) == 5
+
+
+@pytest.mark.parametrize("program", PROGRAMS)
+def test_save_load_round_trip(program, tmp_path):
+    filename = tmp_path / "pitch.json"
+    program.save(filename)
+    loaded = PitchProgram.load(filename)
+
+    assert loaded.to_dict() == program.to_dict()
+    np.testing.assert_array_equal(loaded.table, program.table)
+    heights, h_speeds = _points()
+    assert _scalar(loaded, heights, h_speeds) == _scalar(program, heights, h_speeds)
+
+
+def test_ascent_program_carries_pitch_program():
+    program = PitchProgram([(500, 90), (20000, 20)], final_altitude=None)
+    ascent = AscentProgram(pitch_program=program.to_dict())
+    restored = AscentProgram.from_dict(ascent.to_dict())
+    for h in (0, 500, 7000, 20000, 60000):
+        assert restored.pitch(h, 1000) == program(h, 1000)
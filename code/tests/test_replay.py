@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from ksp_ascent import AscentProgram
+from ksp_replay import replay_flight
+
+
+def _flight():
+    """Запись с отделением: ступень 3 до 80 с, тяги нет на 79.5-80.5 с"""
+    t = np.round(np.arange(0.1, 150.0, 0.1), 1)
+    thrust = np.where(t < 79.5, 6.06e6, 1.44e6)
+    thrust[(t >= 79.5) & (t <= 80.5)] = 0.0
+    return dict(
+        times=t,
+        altitudes=40.0 * t**1.5,
+        speeds=8.0 * t,
+        h_speeds=4.0 * t,
+        thrusts=thrust,
+        stages=np.where(t < 80.0, 3, 2),
+    )
+
+
+def test_replay_sends_separation():
+    result = replay_flight(_flight(), AscentProgram(max_time=150))
+    # Стартовая команда и отделение на выгорании ускорителей
+    assert result["staging"] == [pytest.approx(0.1), pytest.approx(79.5)]
+    assert result["sent"]["stage"] == 2
+    assert result["suppressed"]["stage"] == 0
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from ksp_sampling import AdaptiveSampler, resample_uniform
+
+HIGH = 20000.0  # м, выше малой высоты
+
+
+def _sampler():
+    return AdaptiveSampler(base_period=0.1, fast_period=0.02, slow_period=0.5, hold=2.0)
+
+
+def test_fast_after_start_then_base():
+    sampler = _sampler()
+    assert sampler.update(0.0, 1e6, 3, HIGH) == 0.02
+    assert sampler.update(1.9, 1e6, 3, HIGH) == 0.02
+    assert sampler.update(2.0, 1e6, 3, HIGH) == 0.1
+    assert sampler.rate == pytest.approx(10.0)
+    assert sampler.reason == "активный участок"
+
+
+def test_thrust_drop_holds_fast_rate():
+    sampler = _sampler()
+    sampler.update(5.0, 1e6, 3, HIGH)
+    assert sampler.period == 0.1
+    assert sampler.update(5.1, 0.6e6, 3, HIGH) == 0.02
+    assert sampler.reason == "падение тяги"
+    assert sampler.update(7.0, 0.6e6, 3, HIGH) == 0.02
+    assert sampler.update(7.2, 0.6e6, 3, HIGH) == 0.1
+    assert sampler.events == 1
+
+
+def test_stage_change_and_passive_flight():
+    sampler = _sampler()
+    sampler.update(5.0, 1e6, 3, HIGH)
+    assert sampler.update(5.1, 1e6, 2, HIGH) == 0.02
+    assert sampler.reason == "смена ступени"
+    # Выключение двигателя - тоже падение тяги
+    assert sampler.update(8.0, 0.0, 2, HIGH) == 0.02
+    # Двигатель выключен, событий нет - редкие отсчёты
+    assert sampler.update(10.5, 0.0, 2, HIGH) == 0.5
+    assert sampler.reason == "пассивный участок"
+
+
+def test_fast_descent_from_altitude_difference():
+    sampler = _sampler()
+    sampler.update(10.0, 0.0, 1, 4000.0)
+    assert sampler.period == 0.5
+    # 150 м/с вниз на высоте ниже 5 км - частые отсчёты
+    assert sampler.update(11.0, 0.0, 1, 3850.0) == 0.02
+    assert sampler.reason == "быстрое снижение"
+
+
+def test_resample_irregular_timestamps():
+    times = np.array([0.0, 0.05, 0.07, 0.3, 0.31, 1.0])
+    grid, linear, square = resample_uniform(times, 0.1, 2 * times + 1, times**2)
+    np.testing.assert_allclose(grid, np.arange(11) * 0.1, atol=1e-12)
+    # Линейный ряд восстанавливается точно, остальные - интерполяцией
+    # между ближайшими отсчётами
+    np.testing.assert_allclose(linear, 2 * grid + 1)
+    expected = np.interp(grid, times, times**2)
+    np.testing.assert_allclose(square, expected)
+    assert square[5] == pytest.approx(0.31**2 + (1 - 0.31**2) * (0.5 - 0.31) / 0.69)
+
+
+def test_resample_single_sample():
+    grid, values = resample_uniform([3.0], 0.1, [7.0])
+    assert grid.tolist() == [3.0]
+    assert values.tolist() == [7.0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from ksp_sim import (
+    M0,
+    STATE_KEYS,
+    A,
+    Cd,
+    Extremes,
+    KeyPoints,
+    rocket_stages,
+    run_stream,
+    simulate,
+    simulate_chunks,
+)
+
+RUN = dict(stop_at_apoapsis=True, curvature=True, cd=Cd, area=A)
+TIMES = [0.0, 0.05, 79.5, 150.0, 300.0, 1000.0, 1e6]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return simulate(rocket_stages(), M0, **RUN)
+
+
+def test_blocks_concatenate_to_simulate(reference):
+    blocks = list(simulate_chunks(rocket_stages(), M0, chunk=333, **RUN))
+    assert all(len(b["t"]) <= 333 for b in blocks)
+    for key in STATE_KEYS:
+        joined = np.concatenate([b[key] for b in blocks])
+        np.testing.assert_array_equal(joined, reference[key])
+    assert blocks[-1]["stop"] == reference["stop"] == "apoapsis"
+
+
+def test_consumers_match_simulate(reference):
+    points = KeyPoints(TIMES)
+    extremes = Extremes()
+    last = run_stream(
+        simulate_chunks(rocket_stages(), M0, chunk=333, **RUN), points, extremes
+    )
+    assert last["steps"] == reference["steps"]
+
+    # Ближайшая точка по всему прогону (при равенстве - более ранняя)
+    t = reference["t"]
+    nearest = [np.abs(t - time).argmin() for time in TIMES]
+    for key in STATE_KEYS:
+        np.testing.assert_array_equal(points.state[key], reference[key][nearest])
+
+    assert extremes.v_max == reference["v"].max()
+    assert extremes.t_v_max == t[reference["v"].argmax()]
+    assert extremes.h_max == reference["h"].max()
+    assert extremes.t_h_max == t[reference["h"].argmax()]
+    assert extremes.final == {key: reference[key][-1] for key in STATE_KEYS}
@@ -0,0 +1,83 @@
+from ksp_ascent import StagingSequencer
+
+
+class FakeCommands:
+    """Записывает команды отделения вместо отправки кораблю"""
+
+    def __init__(self):
+        self.stagings = []
+
+    def activate_next_stage(self, current_stage, force=False):
+        self.stagings.append((current_stage, force))
+        return True
+
+
+def _run(sequencer, readings):
+    """Прогоняет показания (t, тяга, ступень) и возвращает события"""
+    return [
+        (t, event)
+        for t, thrust, stage in readings
+        if (event := sequencer.update(t, thrust, stage)) is not None
+    ]
+
+
+def test_normal_separation():
+    commands = FakeCommands()
+    sequencer = StagingSequencer(commands, timeout=1.0, settle=0.5)
+    events = _run(
+        sequencer,
+        [
+            (10.0, 200.0, 3),  # тяга есть - ничего не делаем
+            (10.1, 0.0, 3),  # выгорание - отделение
+            (10.2, 0.0, 3),  # ждём, команда не повторяется
+            (10.3, 150.0, 2),  # ступень сменилась, двигатель зажёгся
+            (10.5, 0.0, 2),  # провал тяги при выдержке не выгорание
+            (10.9, 150.0, 2),
+            (11.0, 150.0, 2),
+        ],
+    )
+    assert events == [(10.1, "stage"), (10.3, "ignition"), (10.9, "settled")]
+    assert commands.stagings == [(3, False)]
+    assert sequencer.state == "idle"
+    assert sequencer.retries == 0
+
+
+def test_timeout_retry_forces_command():
+    commands = FakeCommands()
+    sequencer = StagingSequencer(commands, timeout=1.0, settle=0.5)
+    events = _run(
+        sequencer,
+        [
+            (20.0, 0.0, 3),
+            (20.5, 0.0, 3),
+            (21.1, 0.0, 3),  # команда не выполнена за timeout - повтор
+            (21.5, 0.0, 3),
+            (21.6, 120.0, 2),
+        ],
+    )
+    assert events == [(20.0, "stage"), (21.1, "retry"), (21.6, "ignition")]
+    assert commands.stagings == [(3, False), (3, True)]
+    assert sequencer.retries == 1
+
+
+def test_stage_without_engine_is_skipped():
+    commands = FakeCommands()
+    sequencer = StagingSequencer(commands, timeout=1.0, settle=0.5)
+    events = _run(
+        sequencer,
+        [
+            (30.0, 0.0, 3),
+            (30.2, 0.0, 2),  # отделился только разделитель
+            (31.2, 0.0, 2),  # тяги нет дольше timeout - следующая ступень
+            (31.4, 90.0, 1),
+        ],
+    )
+    assert events == [(30.0, "stage"), (31.2, "stage"), (31.4, "ignition")]
+    assert commands.stagings == [(3, False), (2, False)]
+
+
+def test_last_stage_not_separated():
+    commands = FakeCommands()
+    sequencer = StagingSequencer(commands)
+    assert sequencer.update(40.0, 0.0, 1) is None
+    assert commands.stagings == []
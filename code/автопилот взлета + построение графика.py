@@ -1,97 +1,61 @@
-import krpc
-import time
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
 
-print("🚀 ПОДКЛЮЧЕНИЕ К KSP...")
-conn = krpc.connect(name="KSP_Telemetry")
-vessel = conn.space_center.active_vessel
+from ksp_ascent import FLIGHT_ARRAYS, AscentProgram, fly_ascent
+from ksp_bus import TelemetryBus
+from ksp_control import CommandOutput
+from ksp_link import FlightLink
+from ksp_plot import save_flight, style_speed_time
+from ksp_rpc_profile import RpcProfiler
+from ksp_sampling import AdaptiveSampler, resample_uniform
+from ksp_spans import LoopSpans
 
-# Параметры
-TARGET_ALTITUDE = 450000
-MAX_TIME = 150
-TURN_START = 800
-TURN_END = 25000
+print("🚀 ПОДКЛЮЧЕНИЕ К KSP...")
+link = FlightLink(name="KSP_Telemetry")
+profiler = RpcProfiler(link.control_conn)
+vessel = link.vessel  # команды
+commands = CommandOutput(vessel)  # команды без повторов
 
-# Массивы данных
-times = []
-speeds = []  # Глобальная скорость
-altitudes = []  # Высота
-thrusts = []  # Тяга
+# Параметры полёта (цель, лимит времени); программа разворота - по
+# умолчанию, как в модели (ksp_pitch.DEFAULT_PITCH)
+program = AscentProgram(target_altitude=450000, max_time=150)
 
 print("1. ЗАПУСК ДВИГАТЕЛЕЙ...")
-vessel.control.gear = False
-vessel.auto_pilot.engage()
-vessel.auto_pilot.target_pitch_and_heading(90, 90)
-vessel.control.throttle = 1.0
-vessel.control.activate_next_stage()
-
-start_time = time.time()
+# Шина телеметрии для внешних читателей (python ksp_bus.py)
+bus = TelemetryBus()
+sampler = AdaptiveSampler(base_period=0.1)
+# Разметка итераций цикла по фазам (enabled=False - выключить)
+spans = LoopSpans(enabled=True)
 
 print("\n2. СБОР ТЕЛЕМЕТРИИ...")
-print("Время(с)  Высота(м)  Скорость(м/с)  Тяга(кН)")
-print("-" * 60)
-
 try:
-    # Летим до 150 секунд или достижения целевой высоты
-    while (
-        time.time() - start_time
-    ) < 150 and vessel.flight().mean_altitude < TARGET_ALTITUDE:
-        current_time = time.time() - start_time
-
-        if current_time > MAX_TIME:
-            print(f"\nДостигнуто максимальное время ({MAX_TIME} секунд)")
-            break
-
-        # Получаем скорость - ГЛОБАЛЬНУЮ скорость (орбитальную)
-        current_speed = vessel.orbit.speed
-
-        # Автопилот
-        altitude = vessel.flight().mean_altitude
-        h_speed = vessel.flight().horizontal_speed
-
-        if TURN_START < altitude < TURN_END:
-            turn_angle = ((altitude - TURN_START) / (TURN_END - TURN_START)) * 80
-            vessel.auto_pilot.target_pitch_and_heading(90 - turn_angle, 90)
-
-        if altitude > 30000 and h_speed > 800:
-            vessel.auto_pilot.target_pitch_and_heading(5, 90)
-
-        # Сбор данных
-        times.append(current_time)
-        speeds.append(current_speed)
-        altitudes.append(altitude)
-        thrusts.append(vessel.thrust)
-
-        # Логирование каждые 10 секунд
-        if int(current_time) % 10 == 0 and current_time - int(current_time) < 0.1:
-            thrust_kn = vessel.thrust / 1000
-            print(
-                f"{current_time:6.1f}с  {altitude:8.0f}м  {current_speed:10.1f}м/с  {thrust_kn:8.1f}кН"
-            )
-
-        # Отделение ступеней
-        if vessel.thrust == 0 and vessel.control.current_stage > 1:
-            print(f"\nОтделение ступени на {current_time:.1f}с")
-            vessel.control.activate_next_stage()
-            time.sleep(1)
-
-        time.sleep(0.1)
-
-except Exception as e:
-    print(f"\nОшибка: {e}")
+    flight = fly_ascent(
+        link, program, commands, sampler, bus=bus, profiler=profiler, spans=spans
+    )
+finally:
+    bus.close()
+    link.telemetry.remove()
+times = flight["times"]
 
 print(f"\n3. ПОЛЕТ ЗАВЕРШЕН")
 print(f"   Собрано точек: {len(times)}")
 print(f"   Общее время: {times[-1]:.1f} с")
 vessel.auto_pilot.disengage()
 
-# Конвертируем в numpy
-times = np.array(times)
-speeds = np.array(speeds)
-altitudes = np.array(altitudes)
-thrusts = np.array(thrusts)
+# Сырые отсчёты с неравномерным шагом идут в архив
+raw_flight = {key: flight[key] for key in FLIGHT_ARRAYS}
+raw_flight["separations"] = flight["separations"]
+
+# Сглаживание работает по индексам - переводим отсчёты на равномерную
+# сетку 0.1 с
+times, speeds, altitudes, thrusts = resample_uniform(
+    raw_flight["times"],
+    0.1,
+    raw_flight["speeds"],
+    raw_flight["altitudes"],
+    raw_flight["thrusts"],
+)
 
 # ============================================================================
 # ОБРАБОТКА ДАННЫХ
@@ -116,23 +80,21 @@ if len(speeds) > 5:
 else:
     speeds_final = speeds
 
-# Определяем момент отделения ускорителей по падению тяги
+# Момент отделения ускорителей - первый скачок массы, замеченный в полёте
 t_sep = None
 sep_speed = None
 sep_idx = None
 
-if len(thrusts) > 50:
-    for i in range(20, len(thrusts) - 10):
-        if thrusts[i] < thrusts[i - 1] * 0.4 and thrusts[i] > 0:
-            # Проверяем, что после падения тяга снова растет (включение основного двигателя)
-            if i + 10 < len(thrusts) and thrusts[i + 10] > thrusts[i] * 1.5:
-                t_sep = times[i]
-                sep_speed = speeds_final[i] if "speeds_final" in locals() else speeds[i]
-                sep_idx = i
-                print(
-                    f"Обнаружено отделение ускорителей на {t_sep:.1f} с, скорость {sep_speed:.0f} м/с"
-                )
-                break
+if len(flight["separations"]) and len(times) > 0:
+    t_found, dropped = flight["separations"][0]
+    i = int(np.argmin(np.abs(times - t_found)))
+    t_sep = times[i]
+    sep_speed = speeds_final[i] if "speeds_final" in locals() else speeds[i]
+    sep_idx = i
+    print(
+        f"Обнаружено отделение ускорителей на {t_sep:.1f} с, "
+        f"скорость {sep_speed:.0f} м/с (сброшено {dropped / 1000:.1f} т)"
+    )
 
 if t_sep is None:
     # Если не нашли автоматически, используем значение из предыдущих запусков
@@ -150,6 +112,7 @@ print(f"- Время: {times[0]:.1f} - {times[-1]:.1f} с")
 print(f"- Скорость: {speeds_final[0]:.1f} - {speeds_final[-1]:.1f} м/с")
 print(f"- Максимальная скорость: {np.max(speeds_final):.1f} м/с")
 print(f"- Высота в конце: {altitudes[-1]/1000:.1f} км")
+spans.summary()
 
 # ============================================================================
 # ГРАФИК: v(t) - СКОРОСТЬ ОТ ВРЕМЕНИ (как на фото)
@@ -200,30 +163,14 @@ ax.text(
     zorder=6,
 )
 
-# 3. Настройка осей
-ax.set_xlabel("Время полета, с", fontsize=14, fontweight="bold", labelpad=10)
-ax.set_ylabel("Скорость ракеты, м/с", fontsize=14, fontweight="bold", labelpad=10)
-ax.set_title(
+# 3. Оси, сетка и подписи - общий шаблон
+style_speed_time(
+    ax,
     "График зависимости скорости ракеты от времени\n(Экспериментальные данные KSP)",
-    fontsize=16,
-    fontweight="bold",
-    pad=20,
+    v_max=1800,
+    v_minor=100,
 )
 
-# Границы как на фото
-ax.set_xlim(0, 150)
-ax.set_ylim(0, 1800)
-
-# Сетка
-ax.set_xticks(np.arange(0, 151, 25))
-ax.set_yticks(np.arange(0, 1801, 250))
-minor_xticks = np.arange(0, 151, 5)
-minor_yticks = np.arange(0, 1801, 100)
-ax.set_xticks(minor_xticks, minor=True)
-ax.set_yticks(minor_yticks, minor=True)
-ax.grid(True, which="major", linestyle="-", alpha=0.3, linewidth=1.0)
-ax.grid(True, which="minor", linestyle=":", alpha=0.2, linewidth=0.5)
-
 # 4. Легенда
 ax.legend(loc="lower right", fontsize=12, framealpha=0.95)
 
@@ -349,6 +296,10 @@ filename = f"ksp_speed_vs_time_эксперимент_{timestamp}.png"
 plt.savefig(filename, dpi=300, bbox_inches="tight")
 print(f"\n✅ ГРАФИК СОХРАНЕН: {filename}")
 
+# Телеметрия в архив для пакетной перерисовки (ksp_plot.py)
+flight_file = save_flight(name=f"flight_{timestamp}", t_sep=t_sep, **raw_flight)
+print(f"✅ ТЕЛЕМЕТРИЯ СОХРАНЕНА: {flight_file}")
+
 # ============================================================================
 # ВЫВОД ДАННЫХ ДЛЯ СРАВНЕНИЯ
 # ============================================================================
@@ -368,5 +319,9 @@ if len(times) > 0:
 print("\n" + "=" * 60)
 print("=" * 60)
 
+# Профиль вызовов kRPC за полёт
+profiler.summary()
+commands.summary()
+
 # Показываем график
 plt.show()
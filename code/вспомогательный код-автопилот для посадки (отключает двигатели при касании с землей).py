@@ -1,6 +1,13 @@
 import krpc
+import math
+import sys
 import time
 
+from ksp_link import StreamGroup
+
+# Состояния корабля на поверхности
+LANDED = ("landed", "splashed")
+
 
 class AutoShutdown:
     def __init__(self):
@@ -60,10 +67,185 @@ class AutoShutdown:
             self.control.throttle = 0
 
 
-# Запуск
+class SuicideBurn(AutoShutdown):
+    """Посадка с торможением в последний момент и отключением при касании"""
+
+    def __init__(
+        self,
+        throttle_margin=0.85,  # доля тяги, на которую рассчитывается торможение
+        touchdown_speed=2.0,  # скорость касания, м/с
+        final_altitude=3.0,  # высота передачи управления автоотключению, м
+        rate=50.0,  # частота цикла управления, Гц
+        gain=0.5,  # коэффициент по ошибке скорости, 1/с
+    ):
+        super().__init__()
+        self.throttle_margin = throttle_margin
+        self.touchdown_speed = touchdown_speed
+        self.final_altitude = final_altitude
+        self.period = 1.0 / rate
+        self.gain = gain
+
+        self.g = self.vessel.orbit.body.surface_gravity
+
+        # Расстояние от центра масс до низа корабля (опор)
+        bbox = self.vessel.bounding_box(self.vessel.reference_frame)
+        self.height_offset = -bbox[0][1]
+
+        # Потоки вместо RPC в каждой итерации; нужны только до касания
+        flight = self.vessel.flight(self.vessel.orbit.body.reference_frame)
+        self.streams = StreamGroup(self.conn)
+        add = self.streams.add
+        self.surface_altitude = add(getattr, flight, "surface_altitude")
+        self.vertical_speed = add(getattr, flight, "vertical_speed")
+        self.mass = add(getattr, self.vessel, "mass")
+        self.available_thrust = add(getattr, self.vessel, "available_thrust")
+        self.situation = add(getattr, self.vessel, "situation")
+
+        self.latencies = []  # длительность итераций цикла управления, с
+        self.overruns = 0  # итераций, не уложившихся в период
+
+    def height(self):
+        """Высота низа корабля над поверхностью, м"""
+        return self.surface_altitude() - self.height_offset
+
+    def max_deceleration(self):
+        """Располагаемое торможение с учётом тяжести, м/с²"""
+        thrust = self.available_thrust() * self.throttle_margin
+        return thrust / self.mass() - self.g
+
+    def time_to_impact(self, h, v):
+        """Время до удара при свободном падении, с"""
+        fall = -v  # скорость снижения, v < 0 при снижении
+        return (-fall + math.sqrt(fall * fall + 2 * self.g * max(h, 0.0))) / self.g
+
+    def burn_altitude(self, v):
+        """Высота, на которой нужно начать торможение, м"""
+        a = self.max_deceleration()
+        if a <= 0:
+            return math.inf  # тяги не хватает даже на зависание
+        return (v * v - self.touchdown_speed**2) / (2 * a) + self.final_altitude
+
+    def wait_for_burn(self):
+        """Ожидание момента начала торможения"""
+        print("Ожидание начала торможения...")
+        while True:
+            h = self.height()
+            v = self.vertical_speed()
+            h_burn = self.burn_altitude(v)
+            if v < 0 and h <= h_burn:
+                print(f"\n▶ НАЧАЛО ТОРМОЖЕНИЯ: высота {h:.0f}м, скорость {v:.1f}м/с")
+                return
+            status = (
+                f"Высота: {h:7.0f}м | Скорость: {v:7.1f}м/с | "
+                f"Удар через: {self.time_to_impact(h, v):5.1f}с | "
+                f"Торможение с: {h_burn:7.0f}м"
+            )
+            print(status, end="\r")
+            time.sleep(min(self.period, 0.02) if h < 2 * h_burn else 0.1)
+
+    def throttle_command(self, h, v, m, thrust):
+        """Тяга для выхода на скорость касания к высоте final_altitude"""
+        if thrust <= 0:
+            return 1.0
+        h_left = max(h - self.final_altitude, 0.0)
+        # Опорный профиль: равнозамедленное снижение до touchdown_speed
+        a_plan = self.max_deceleration()
+        v_ref = -math.sqrt(self.touchdown_speed**2 + 2 * max(a_plan, 0.0) * h_left)
+        # Требуемое замедление + поправка по ошибке скорости
+        a_req = (
+            (v * v - self.touchdown_speed**2) / (2 * h_left) if h_left > 0.5 else 0.0
+        )
+        a_cmd = max(a_req, 0.0) + self.g + self.gain * (v_ref - v)
+        return min(max(a_cmd * m / thrust, 0.0), 1.0)
+
+    def burn(self):
+        """
+        Замкнутый цикл управления тягой до высоты final_altitude (или до
+        касания, если опоры встали на грунт выше неё)
+        """
+        control = self.control
+        next_tick = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            h = self.height()
+            v = self.vertical_speed()
+            if h <= self.final_altitude or self.situation().name in LANDED:
+                break
+            if v >= 0:
+                # Перетормозили: без тяги корабль снова пойдёт вниз, и цикл
+                # продолжит торможение - до final_altitude управление не
+                # отдаётся
+                control.throttle = 0.0
+            else:
+                control.throttle = self.throttle_command(
+                    h, v, self.mass(), self.available_thrust()
+                )
+            elapsed = time.perf_counter() - start
+            self.latencies.append(elapsed)
+
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Не успели - не копим отставание
+                self.overruns += 1
+                next_tick = time.perf_counter()
+
+        # Почти зависание: плавное касание, дальше работает автоотключение
+        hover = self.mass() * self.g / max(self.available_thrust(), 1.0)
+        control.throttle = min(0.95 * hover, 1.0)
+        print(f"\n✓ Высота {self.height():.1f}м: снижение до касания")
+
+    def report_latency(self):
+        """Статистика задержки цикла управления"""
+        if not self.latencies:
+            return
+        values = sorted(self.latencies)
+        n = len(values)
+        p50 = values[n // 2] * 1000
+        p99 = values[min(n - 1, int(n * 0.99))] * 1000
+        print("\nЦИКЛ УПРАВЛЕНИЯ:")
+        print(f"- Итераций: {n} (период {self.period * 1000:.0f} мс)")
+        worst = values[-1] * 1000
+        print(f"- Задержка: p50 {p50:.1f} мс, p99 {p99:.1f} мс, макс {worst:.1f} мс")
+        print(f"- Превышений периода: {self.overruns}")
+
+    def land(self):
+        """Полная посадка: ожидание, торможение, отключение при касании"""
+        try:
+            print("=== ПОСАДКА С ТОРМОЖЕНИЕМ В ПОСЛЕДНИЙ МОМЕНТ ===")
+            self.control.sas = True
+            self.control.sas_mode = self.conn.space_center.SASMode.retrograde
+            self.control.throttle = 0
+            self.control.gear = True
+
+            self.wait_for_burn()
+            self.burn()
+        except KeyboardInterrupt:
+            print("\n=== ПОСАДКА ПРЕРВАНА ===")
+            self.control.throttle = 0
+            return
+        except Exception as e:
+            print(f"\nОШИБКА: {e}")
+            self.control.throttle = 0
+            return
+        finally:
+            # Автоотключению потоки не нужны - останавливаем, как FlightLink.close
+            self.streams.remove()
+            self.report_latency()
+
+        # Финальная стадия - прежнее автоотключение при касании
+        self.monitor_touchdown()
+
+
+# Запуск (--burn: посадка с торможением, иначе только автоотключение)
 if __name__ == "__main__":
     try:
-        shutdown = AutoShutdown()
-        shutdown.monitor_touchdown()
+        if "--burn" in sys.argv:
+            SuicideBurn().land()
+        else:
+            shutdown = AutoShutdown()
+            shutdown.monitor_touchdown()
     except Exception as e:
         print(f"Ошибка: {e}")
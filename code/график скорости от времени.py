@@ -2,36 +2,44 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 
-# Константы Кербина
-R = 600000.0  # м
-g0 = 9.81  # м/с²
-rho0 = 1.223  # кг/м³
-H_atm = 5000.0  # м
-
-# Параметры ракеты (оригинальные)
-M0 = 439000.0  # кг
-F_b = 1515000.0  # Н (один ускоритель)
-F_m = 1443000.0  # Н (основной двигатель)
-Isp_b = 205.0  # с (ускорители)
-Isp_m = 275.0  # с (основной)
-Cd = 0.25
-A = 7.07  # м²
+from ksp_plot import style_speed_time
+from ksp_sim import (
+    LOSS_KEYS,
+    LOSS_NAMES,
+    STOP_REASONS,
+    A,
+    M0,
+    Cd,
+    Extremes,
+    F_b,
+    F_m,
+    Isp_b,
+    Isp_m,
+    KeyPoints,
+    g0,
+    m_boosters_with_fuel,
+    m_fuel_stage1,
+    rocket_stages,
+    run_stream,
+    simulate,
+    simulate_chunks,
+)
+
+# Параметры ракеты (оригинальные: M0, F_b, F_m, Isp_b, Isp_m, Cd, A, массы
+# ступеней) - из ksp_sim, одни для модели, скриптов и суррогатной модели
+ATMOSPHERE = "table"  # табличная атмосфера Кербина; "exp" - экспонента
 
 # Расходы
 mdot_b = F_b / (Isp_b * g0)  # одного ускорителя
 mdot_4b = mdot_b * 4  # четырёх ускорителей
 mdot_m = F_m / (Isp_m * g0)  # основного двигателя
 
-# Масса ускорителей с топливом
-m_boosters_with_fuel = 240000.0  # кг
 # Масса после сброса ускорителей (примерно)
 m_after_boosters = M0 - m_boosters_with_fuel
 
 # Время работы ускорителей
 t_boost = m_boosters_with_fuel / mdot_4b  # ~79.5 с
 
-# Топливо основной ступени
-m_fuel_stage1 = 118000.0  # кг
 t_main_max = m_fuel_stage1 / mdot_m  # время работы основного двигателя
 
 print("=== ПАРАМЕТРЫ ===")
@@ -42,93 +50,20 @@ print(f"Время работы ускорителей: {t_boost:.1f} с")
 print()
 
 
-# Функции
-def rho_atm(h):
-    return rho0 * math.exp(-h / H_atm)
-
-
-def gravity(h):
-    return g0 * (R / (R + h)) ** 2
-
-
-def get_pitch(h, vx):
-    """Угол тангажа по высоте и горизонтальной скорости"""
-    if h < 800:
-        return 90.0
-    elif h < 25000:
-        return 90 - (h - 800) / (25000 - 800) * 80
-    else:
-        if vx > 800:
-            return 5.0
-        else:
-            return 10.0
-
-
 # (уравнение Мещерского) - ДО 150 СЕКУНД
 print("Численное моделирование (до 150 секунд)...")
-h = 0.0
-vx = 0.0
-vy = 0.0
-m = M0
-t = 0.0
 dt = 0.1
 
-times_num = []
-velocities_num = []
-heights_num = []
-masses_num = []
+# Фаза 1: ТОЛЬКО 4 ускорителя, основной двигатель ВЫКЛЮЧЕН
+# Фаза 2: ТОЛЬКО основной двигатель (ускорители сброшены)
+stages = rocket_stages()
 
 # Моделируем до 150 секунд
-while t <= 150.0:
-    # Определяем, какие двигатели работают
-    if t < t_boost:
-        # Фаза 1: ТОЛЬКО 4 ускорителя, основной двигатель ВЫКЛЮЧЕН
-        F = 4 * F_b
-        mdot = mdot_4b
-    else:
-        # Фаза 2: ТОЛЬКО основной двигатель (ускорители сброшены)
-        F = F_m
-        mdot = mdot_m
-        # В момент сброса мгновенно уменьшаем массу
-        if t - dt < t_boost <= t:
-            m = m_after_boosters  # сбрасываем ускорители
-
-    # Угол тангажа
-    pitch = get_pitch(h, vx)
-    theta = math.radians(pitch)
-
-    # Полная скорость
-    v = math.sqrt(vx**2 + vy**2) if (vx != 0 or vy != 0) else 0
-
-    # Атмосфера и гравитация
-    rho = rho_atm(h)
-    g = gravity(h)
-
-    # Сила сопротивления
-    D = 0.5 * rho * v**2 * Cd * A
-    if v > 0:
-        Dx = D * (vx / v)
-        Dy = D * (vy / v)
-    else:
-        Dx, Dy = 0, 0
-
-    # Ускорения (уравнение Мещерского)
-    ax = (F * math.cos(theta) - Dx) / m
-    ay = (F * math.sin(theta) - Dy) / m - g
-
-    # Интегрирование
-    vx += ax * dt
-    vy += ay * dt
-    h += vy * dt
-    m -= mdot * dt
-    t += dt
-
-    # Сохранение
-    v_total = math.sqrt(vx**2 + vy**2)
-    times_num.append(t)
-    velocities_num.append(v_total)
-    heights_num.append(h)
-    masses_num.append(m)
+sim = simulate(stages, M0, dt=dt, t_max=150.0, cd=Cd, area=A, atmosphere=ATMOSPHERE)
+times_num = sim["t"].tolist()
+velocities_num = sim["v"].tolist()
+heights_num = sim["h"].tolist()
+masses_num = sim["m"].tolist()
 
 # (формула Циолковского) - ДО 150 СЕКУНД
 print("Аналитический расчёт (до 150 секунд)...")
@@ -237,29 +172,8 @@ ax.text(
     zorder=10,
 )
 
-# 4. Настройка осей
-ax.set_xlabel("Время полета, с", fontsize=14, fontweight="bold", labelpad=10)
-ax.set_ylabel("Скорость ракеты, м/с", fontsize=14, fontweight="bold", labelpad=10)
-ax.set_title(
-    "График зависимости скорости ракеты от времени",
-    fontsize=16,
-    fontweight="bold",
-    pad=20,
-)
-
-# ГРАНИЦЫ
-ax.set_xlim(0, 150)
-ax.set_ylim(0, 2000)
-
-# Сетка
-ax.set_xticks(np.arange(0, 151, 25))
-ax.set_yticks(np.arange(0, 2001, 250))
-minor_xticks = np.arange(0, 151, 5)
-minor_yticks = np.arange(0, 2001, 50)
-ax.set_xticks(minor_xticks, minor=True)
-ax.set_yticks(minor_yticks, minor=True)
-ax.grid(True, which="major", linestyle="-", alpha=0.3, linewidth=1.0)
-ax.grid(True, which="minor", linestyle=":", alpha=0.15, linewidth=0.5)
+# 4. Оси, сетка и подписи - общий шаблон
+style_speed_time(ax, "График зависимости скорости ракеты от времени")
 
 # 5. Легенда
 ax.legend(loc="lower right", fontsize=12, framealpha=0.95)
@@ -425,6 +339,56 @@ if times_num:
             print(f"Суммарные потери скорости: {loss:.1f} м/с ({loss_percent:.1f}%)")
             print(f"Эффективность: {(1 - loss/v_ideal_150)*100:.1f}%")
 
+            # Разбивка потерь - накоплена в том же прогоне модели
+            print("\nСостав потерь на 150 с:")
+            for key in LOSS_KEYS:
+                value = sim[key][idx_150]
+                share = value / v_ideal_150 * 100
+                print(f"- {LOSS_NAMES[key]}: {value:.1f} м/с ({share:.1f}%)")
+            losses_150 = sum(sim[key][idx_150] for key in LOSS_KEYS)
+            print(
+                f"- Сумма: {losses_150:.1f} м/с "
+                f"(расхождение с суммарными {loss - losses_150:+.1f} м/с - шаг dt)"
+            )
+
+# Полный подъём до апоцентра: пассивный участок над атмосферой - по Кеплеру.
+# Результат нужен только в конце, поэтому прогон идёт блоками без хранения:
+# Extremes - конечное состояние, KeyPoints - состояние на отделении
+# ускорителей и выключении основного двигателя
+t_cutoff = t_boost + t_main_max
+full = Extremes()
+events = KeyPoints([t_boost, t_cutoff])
+last = run_stream(
+    simulate_chunks(
+        stages,
+        M0,
+        dt=dt,
+        stop_at_apoapsis=True,
+        curvature=True,
+        cd=Cd,
+        area=A,
+        atmosphere=ATMOSPHERE,
+    ),
+    full,
+    events,
+)
+print(
+    f"\nПолный подъём ({STOP_REASONS[last['stop']]}): высота {full.final['h']/1000:.1f} км "
+    f"на {full.final['t']:.0f} с, шагов интегрирования: {last['steps']}"
+)
+print(
+    "Потери за подъём: "
+    + ", ".join(
+        f"{LOSS_NAMES[key].lower()} {full.final[key]:.0f} м/с" for key in LOSS_KEYS
+    )
+)
+for i, name in enumerate(("Отделение ускорителей", "Выключение основного двигателя")):
+    print(
+        f"- {name}: {events.state['t'][i]:.1f} с, "
+        f"высота {events.state['h'][i]/1000:.1f} км, "
+        f"скорость {events.state['v'][i]:.0f} м/с"
+    )
+
 print("\n" + "=" * 60)
 
 # Сохраняем график
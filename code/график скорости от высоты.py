@@ -2,20 +2,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 
-# Константы Кербина
-R = 600000.0  # м
-g0 = 9.81  # м/с²
-rho0 = 1.223  # кг/м³
-H_atm = 5000.0  # м
-
-# Параметры ракеты
-M0 = 439000.0  # кг
-F_b = 1515000.0  # Н (один ускоритель)
-F_m = 1443000.0  # Н
-Isp_b = 205.0  # с
-Isp_m = 275.0  # с
-Cd = 0.25
-A = 7.07  # м²
+from ksp_plot import style_speed_height
+from ksp_sim import A, M0, Cd, F_b, F_m, Isp_b, Isp_m, Stage, g0, simulate
+
+# Параметры ракеты - из ksp_sim, как в "график скорости от времени"
+ATMOSPHERE = "table"  # табличная атмосфера Кербина; "exp" - экспонента
 
 # Расходы
 mdot_b = F_b / (Isp_b * g0)  # одного ускорителя
@@ -32,84 +23,27 @@ print(f"Суммарная тяга: {F_total/1e6:.2f} МН")
 print(f"Суммарный расход: {mdot_total:.1f} кг/с")
 print()
 
-# Начальные условия
-h = 0.0  # высота, м
-vx = 0.0  # горизонтальная скорость, м/с
-vy = 0.0  # вертикальная скорость, м/с
-m = M0  # масса, кг
-t = 0.0  # время, с
 dt = 0.1  # шаг интегрирования, с
 
-# Массивы для результатов
-heights = []
-velocities = []
-
-
-# Функции
-def rho_atm(h):
-    return rho0 * math.exp(-h / H_atm)
-
-
-def gravity(h):
-    return g0 * (R / (R + h)) ** 2
-
-
-def get_pitch(h, vx):
-    """Определение угла тангажа по высоте и горизонтальной скорости"""
-    if h < 800:
-        return 90.0
-    elif h < 25000:
-        # Линейный разворот от 90° до 10°
-        return 90 - (h - 800) / (25000 - 800) * 80
-    else:
-        if vx > 800:
-            return 5.0
-        else:
-            return 10.0
-
-
-# Основной цикл моделирования
+# Основной цикл моделирования: все двигатели работают одновременно
 print("Моделирование полёта...")
-while h < 70000:  # моделируем до 70 км высоты
-    # 1. Угол тангажа
-    pitch = get_pitch(h, vx)
-    theta = math.radians(pitch)
-
-    # 2. Полная скорость
-    v = math.sqrt(vx**2 + vy**2) if (vx != 0 or vy != 0) else 0
-
-    # 3. Атмосфера и гравитация
-    rho = rho_atm(h)
-    g = gravity(h)
-
-    # 4. Сила сопротивления
-    D = 0.5 * rho * v**2 * Cd * A
-    if v > 0:
-        Dx = D * (vx / v)
-        Dy = D * (vy / v)
-    else:
-        Dx, Dy = 0, 0
-
-    # 5. Ускорения
-    ax = (F_total * math.cos(theta) - Dx) / m
-    ay = (F_total * math.sin(theta) - Dy) / m - g
-
-    # 6. Интегрирование
-    vx += ax * dt
-    vy += ay * dt
-    h += vy * dt
-    m -= mdot_total * dt
-    t += dt
-
-    # 7. Сохранение результатов
-    v_total = math.sqrt(vx**2 + vy**2)
-    heights.append(h)
-    velocities.append(v_total)
-
-    # Защита от исчерпания топлива
-    if m < M0 * 0.1:  # если осталось меньше 10% массы
-        print(f"⚠️ Топливо на исходе на высоте {h/1000:.1f} км!")
-        break
+sim = simulate(
+    [Stage(F_total, mdot_total, math.inf)],
+    M0,
+    dt=dt,
+    h_max=70000,  # моделируем до 70 км высоты
+    m_min=M0 * 0.1,  # защита от исчерпания топлива (осталось меньше 10% массы)
+    cd=Cd,
+    area=A,
+    atmosphere=ATMOSPHERE,
+)
+heights = sim["h"].tolist()
+velocities = sim["v"].tolist()
+h = heights[-1]
+t = sim["t"][-1]
+
+if sim["stop"] == "fuel":
+    print(f"⚠️ Топливо на исходе на высоте {h/1000:.1f} км!")
 
 print(f"Моделирование завершено на высоте {h/1000:.1f} км")
 print(f"Время моделирования: {t:.1f} с")
@@ -135,32 +69,8 @@ plt.plot(
     label="Теоретическая модель (уравнение Мещерского)",
 )
 
-# Настройка осей
-plt.xlabel("Скорость, м/с", fontsize=14, fontweight="bold")
-plt.ylabel("Высота, км", fontsize=14, fontweight="bold")
-plt.title("Зависимость скорости ракеты от высоты", fontsize=16, fontweight="bold")
-
-# ГРАНИЦЫ
-plt.xlim(0, 1200)
-plt.ylim(0, 70)
-
-# Сетка
-plt.xticks(np.arange(0, 1201, 200))
-plt.yticks(np.arange(0, 71, 10))
-minor_xticks = np.arange(0, 1201, 100)
-minor_yticks = np.arange(0, 71, 5)
-plt.xticks(minor_xticks, minor=True)
-plt.yticks(minor_yticks, minor=True)
-plt.grid(True, which="major", linestyle="-", alpha=0.3, linewidth=1.0)
-plt.grid(True, which="minor", linestyle=":", alpha=0.2, linewidth=0.5)
-
-# Добавляем основные горизонтальные линии
-for y in [10, 20, 30, 40, 50, 60]:
-    plt.axhline(y=y, color="gray", linestyle=":", alpha=0.3, linewidth=0.8)
-
-# Добавляем основные вертикальные линии
-for x in [200, 400, 600, 800, 1000]:
-    plt.axvline(x=x, color="gray", linestyle=":", alpha=0.3, linewidth=0.8)
+# Оси, сетка и подписи - общий шаблон
+style_speed_height(plt.gca(), "Зависимость скорости ракеты от высоты")
 
 # Легенда
 plt.legend(loc="lower right", fontsize=12, framealpha=0.95)